@@ -1,7 +1,11 @@
 """Read C3 network configuration and feed information."""
 
+import heapq
+import threading
+import time
 from datetime import datetime
 
+import cbor2
 from pycardano import Address, MultiAsset
 from rich.console import Console
 from rich.panel import Panel
@@ -16,9 +20,54 @@ from .datums import (
     OracleSettingsVariant,
     RewardAccountsDatum,
 )
+from .contexts import iter_utxos
+from .metrics import NoopReaderMetrics
+from .slots import SlotResolver
 
 console = Console()
 
+# CBOR tags PlutusData uses for constructors 0, 1 and 2.
+CONSTR_0_TAG = 121
+CONSTR_1_TAG = 122
+CONSTR_2_TAG = 123
+
+
+class UtxoCache:
+    """Address-keyed UTxO cache shared by readers polling the same contracts.
+
+    Readers register the minting policy they track at an address, so one
+    fetch keeps the UTxOs relevant to every pair sharing that address.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._policies = {}
+        self._lock = threading.Lock()
+
+    def track(self, address: str, policy_id: str):
+        """Keep UTxOs holding assets of `policy_id` when `address` is fetched."""
+        with self._lock:
+            self._policies.setdefault(address, set()).add(policy_id)
+
+    def policies(self, address: str):
+        """Policies tracked at an address."""
+        with self._lock:
+            return frozenset(self._policies.get(address, ()))
+
+    def get(self, key):
+        """Return cached UTxOs for a key, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, key, utxos):
+        """Store the UTxOs fetched for a key."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), utxos)
+
 
 class Charli3NetworkInfoReader:
     """
@@ -34,8 +83,13 @@ class Charli3NetworkInfoReader:
         minting_policy: str,
         context,
         category: str = "charli3-network-feed",
+        metrics=None,
+        utxo_cache=None,
+        slot_resolver=None,
+        results=None,
     ):
         self.network_address = network_address
+        self.minting_policy = minting_policy
         self.category = category
         self.aggregate_state_nft = MultiAsset.from_primitive(
             {minting_policy: {b"AggState": 1}}
@@ -53,6 +107,14 @@ class Charli3NetworkInfoReader:
             {minting_policy: {b"C3RA": 1}}
         )
         self.context = context
+        self.metrics = metrics if metrics is not None else NoopReaderMetrics()
+        self.utxo_cache = utxo_cache
+        if utxo_cache is not None:
+            utxo_cache.track(str(network_address), str(minting_policy))
+        self.slot_resolver = (
+            slot_resolver if slot_resolver is not None else SlotResolver(context)
+        )
+        self.results = results
 
     def is_odv(self):
         """Whether the current contract uses the ODV datum layout."""
@@ -66,9 +128,45 @@ class Charli3NetworkInfoReader:
         """Convert POSIX time in milliseconds to minutes."""
         return timestamp / 60000
 
+    def tracked_policies(self):
+        """Minting policies whose UTxOs are kept when the address is fetched."""
+        if self.utxo_cache is not None:
+            return self.utxo_cache.policies(str(self.network_address))
+        return frozenset({str(self.minting_policy)})
+
     def get_contract_utxos(self):
-        """Fetch all UTxOs at the configured contract address."""
-        return self.context.utxos(str(self.network_address))
+        """Fetch the contract UTxOs holding an asset of the tracked policies.
+
+        When a `UtxoCache` is attached, readers sharing it reuse each other's
+        results for the same address until the cache entry expires.
+        """
+        address = str(self.network_address)
+        key = (address, self.tracked_policies())
+        if self.utxo_cache is not None:
+            utxos = self.utxo_cache.get(key)
+            self.metrics.cache_lookup(hit=utxos is not None)
+            if utxos is not None:
+                return utxos
+
+        with self.metrics.time_fetch():
+            utxos = list(iter_utxos(self.context, *key))
+
+        if self.utxo_cache is not None:
+            self.utxo_cache.put(key, utxos)
+        return utxos
+
+    def iter_contract_utxos(self):
+        """Iterate the contract UTxOs holding an asset of the tracked policies.
+
+        Without a cache, pages are fetched as the iteration advances and other
+        UTxOs are dropped on arrival, so singleton lookups stop at the first
+        match and memory follows the relevant UTxOs, not the address size.
+        """
+        if self.utxo_cache is not None:
+            return iter(self.get_contract_utxos())
+        return iter_utxos(
+            self.context, str(self.network_address), self.tracked_policies()
+        )
 
     def utxo_has_asset(self, utxo, asset: MultiAsset):
         """Check whether a UTxO contains the requested NFT."""
@@ -82,38 +180,164 @@ class Charli3NetworkInfoReader:
             return primitive.hex() if isinstance(primitive, bytes) else str(primitive)
         return key_hash.hex() if isinstance(key_hash, bytes) else str(key_hash)
 
+    def decode_datum(self, datum_cls, datum_cbor):
+        """Decode a datum, recording its decode latency."""
+        with self.metrics.time_decode():
+            return datum_cls.from_cbor(datum_cbor)
+
     def parse_feed_datum(self, datum_cbor):
         """Parse the shared feed datum used by legacy and ODV aggregate states."""
-        return GenericData.from_cbor(datum_cbor)
+        return self.decode_datum(GenericData, datum_cbor)
 
-    def get_valid_odv_feed_entries(self):
-        """Fetch non-empty ODV aggregate-state UTxOs sorted by creation time."""
-        feed_entries = []
+    def is_placeholder_datum(self, datum_cbor):
+        """Whether raw datum CBOR is the empty `NoDatum` of an unused C3AS."""
+        try:
+            datum = cbor2.loads(datum_cbor)
+        except Exception:
+            return False
+        return (
+            isinstance(datum, cbor2.CBORTag)
+            and datum.tag == CONSTR_1_TAG
+            and not datum.value
+        )
 
-        for utxo in self.get_contract_utxos():
+    def peek_feed_values(self, datum_cbor):
+        """Read (price, timestamp, expiry) from raw feed datum CBOR.
+
+        The whole datum is parsed with `cbor2.loads` into plain CBOR values;
+        only the `GenericData`/`PriceData` PlutusData objects are skipped.
+        Returns None unless the datum has the exact `GenericData(PriceData)`
+        shape with non-zero values.
+        """
+        try:
+            datum = cbor2.loads(datum_cbor)
+        except Exception:
+            return None
+        if (
+            not isinstance(datum, cbor2.CBORTag)
+            or datum.tag != CONSTR_0_TAG
+            or len(datum.value) != 1
+        ):
+            return None
+        price_data = datum.value[0]
+        if (
+            not isinstance(price_data, cbor2.CBORTag)
+            or price_data.tag != CONSTR_2_TAG
+            or len(price_data.value) != 1
+            or not isinstance(price_data.value[0], dict)
+        ):
+            return None
+        price_map = price_data.value[0]
+        values = tuple(price_map.get(key) for key in (0, 1, 2))
+        if not all(isinstance(value, int) and value for value in values):
+            return None
+        return values
+
+    def decode_feed_entry(self, datum_cbor):
+        """Fully decode a C3AS datum into `(parsed_datum, (price, timestamp, expiry))`.
+
+        Returns None for empty placeholders, including datums missing one of
+        the values. Other datums that fail to decode are recorded as decode
+        errors and raise `ValueError`.
+        """
+        try:
+            parsed_datum = self.parse_feed_datum(datum_cbor)
+            price_data = parsed_datum.price_data
+            values = (
+                price_data.get_price(),
+                price_data.get_timestamp(),
+                price_data.get_expiry(),
+            )
+        except Exception as exc:
+            # Empty ODV C3AS placeholders do not decode as full price data.
+            if self.is_placeholder_datum(datum_cbor):
+                return None
+            self.metrics.decode_error("GenericData")
+            raise ValueError(f"Undecodable C3AS datum: {exc}") from exc
+        return (parsed_datum, values) if all(values) else None
+
+    def get_latest_odv_feed_entries(self, limit: int):
+        """Fetch the `limit` newest non-empty ODV aggregate states.
+
+        Every C3AS datum is parsed as plain CBOR to read its timestamp (see
+        `peek_feed_values`); only the newest ones are decoded as `GenericData`,
+        moving on to older entries when one fails to decode. Entries are
+        returned oldest first.
+        """
+        candidates = []
+        placeholders = 0
+
+        for utxo in self.iter_contract_utxos():
             if not self.utxo_has_asset(utxo, self.odv_aggregate_state_nft):
                 continue
 
             datum = getattr(utxo.output, "datum", None)
             if not datum or not getattr(datum, "cbor", None):
+                placeholders += 1
+                continue
+            values = self.peek_feed_values(datum.cbor)
+            if values is None and not self.is_placeholder_datum(datum.cbor):
+                # Unusual encodings get the full decode to tell valid values
+                # from decode errors.
+                try:
+                    entry = self.decode_feed_entry(datum.cbor)
+                except ValueError:
+                    continue
+                values = entry[1] if entry else None
+            if values is None:
+                placeholders += 1
                 continue
+            candidates.append((-values[1], len(candidates), datum.cbor, utxo))
 
+        heapq.heapify(candidates)
+        latest = []
+        while candidates and len(latest) < limit:
+            _, _, datum_cbor, utxo = heapq.heappop(candidates)
             try:
-                parsed_datum = self.parse_feed_datum(datum.cbor)
-                price_data = parsed_datum.price_data
-                if not all(
-                    (
-                        price_data.get_price(),
-                        price_data.get_timestamp(),
-                        price_data.get_expiry(),
-                    )
-                ):
-                    continue
-                feed_entries.append((price_data.get_timestamp(), parsed_datum, utxo))
-            except Exception:
-                # Empty ODV C3AS placeholders do not decode as full price data.
+                entry = self.decode_feed_entry(datum_cbor)
+            except ValueError:
+                continue
+            if entry is None:
+                placeholders += 1
+                continue
+            parsed_datum, values = entry
+            latest.append((values[1], parsed_datum, utxo))
+
+        self.metrics.observe_c3as(len(latest) + len(candidates), placeholders)
+        latest.reverse()
+        return latest
+
+    def get_valid_odv_feed_entries(self, limit=None):
+        """Fetch non-empty ODV aggregate-state UTxOs sorted by creation time.
+
+        With `limit`, only the newest `limit` entries are decoded and returned.
+        """
+        if limit is not None:
+            return self.get_latest_odv_feed_entries(limit)
+
+        feed_entries = []
+        placeholders = 0
+
+        for utxo in self.iter_contract_utxos():
+            if not self.utxo_has_asset(utxo, self.odv_aggregate_state_nft):
+                continue
+
+            datum = getattr(utxo.output, "datum", None)
+            try:
+                entry = (
+                    self.decode_feed_entry(datum.cbor)
+                    if datum and getattr(datum, "cbor", None)
+                    else None
+                )
+            except ValueError:
+                continue
+            if entry is None:
+                placeholders += 1
                 continue
+            parsed_datum, values = entry
+            feed_entries.append((values[1], parsed_datum, utxo))
 
+        self.metrics.observe_c3as(len(feed_entries), placeholders)
         feed_entries.sort(key=lambda item: item[0])
         return feed_entries
 
@@ -122,7 +346,7 @@ class Charli3NetworkInfoReader:
         core_settings_utxo = next(
             (
                 utxo
-                for utxo in self.get_contract_utxos()
+                for utxo in self.iter_contract_utxos()
                 if self.utxo_has_asset(utxo, self.odv_core_settings_nft)
             ),
             None,
@@ -135,13 +359,18 @@ class Charli3NetworkInfoReader:
         if not datum or not getattr(datum, "cbor", None):
             raise ValueError("The C3CS UTxO does not contain an inline datum.")
 
-        return OracleSettingsVariant.from_cbor(datum.cbor).datum, core_settings_utxo
+        try:
+            settings = self.decode_datum(OracleSettingsVariant, datum.cbor).datum
+        except Exception:
+            self.metrics.decode_error("OracleSettingsVariant")
+            raise
+        return settings, core_settings_utxo
 
     def get_odv_reward_account_entries(self):
         """Fetch all ODV reward-account UTxOs sorted by creation time."""
         reward_entries = []
 
-        for utxo in self.get_contract_utxos():
+        for utxo in self.iter_contract_utxos():
             if not self.utxo_has_asset(utxo, self.odv_reward_accounts_nft):
                 continue
 
@@ -149,17 +378,107 @@ class Charli3NetworkInfoReader:
             if not datum or not getattr(datum, "cbor", None):
                 continue
 
-            reward_accounts = RewardAccountsDatum.from_cbor(datum.cbor).reward_accounts
+            try:
+                reward_accounts = self.decode_datum(
+                    RewardAccountsDatum, datum.cbor
+                ).reward_accounts
+            except Exception:
+                self.metrics.decode_error("RewardAccountsDatum")
+                raise
             reward_entries.append((reward_accounts.created_at, reward_accounts, utxo))
 
         reward_entries.sort(key=lambda item: item[0])
         return reward_entries
 
-    def display_odv_oracle_feed(self):
-        """Display all valid ODV aggregate-state feed UTxOs."""
-        feed_entries = self.get_valid_odv_feed_entries()
-        if not feed_entries:
+    def result(self, kind, compute, **params):
+        """JSON-friendly result of `compute(**params)`.
+
+        When `results` is attached (a result-broker client bound to this
+        pair), a fresh result held by the broker is used instead.
+        """
+        if self.results is None:
+            return compute(**params)
+        return self.results(kind, params, lambda: compute(**params))
+
+    def feed_result(self, limit=None):
+        """Valid ODV feed values oldest first, or the legacy OracleFeed value."""
+        if not self.is_odv():
+            return self.legacy_feed_result()
+
+        rows = []
+        for _, datum, utxo in self.get_valid_odv_feed_entries(limit):
+            price_data = datum.price_data
+            rows.append(
+                {
+                    "utxo": f"{utxo.input.transaction_id}#{utxo.input.index}",
+                    "output_index": utxo.input.index,
+                    "price": price_data.get_price(),
+                    "timestamp": price_data.get_timestamp(),
+                    "expiry": price_data.get_expiry(),
+                }
+            )
+        if not rows:
             raise ValueError("No non-empty C3AS UTxOs found for this ODV contract.")
+        return rows
+
+    def legacy_feed_result(self):
+        """Legacy OracleFeed value; prices stay None unless the datum is inline."""
+        utxo = self.get_oracle_feed_utxo()
+        datum = utxo.output.datum
+        result = {
+            "utxo": f"{utxo.input.transaction_id}#{utxo.input.index}",
+            "datum_type": type(datum).__name__,
+            "price": None,
+            "timestamp": None,
+            "expiry": None,
+        }
+        if datum and not isinstance(datum, AggDatum) and getattr(datum, "cbor", None):
+            try:
+                price_data = self.parse_feed_datum(datum.cbor).price_data
+            except Exception:
+                self.metrics.decode_error("GenericData")
+                raise
+            result["price"] = price_data.get_price()
+            result["timestamp"] = price_data.get_timestamp()
+            result["expiry"] = price_data.get_expiry()
+        return result
+
+    def settings_result(self):
+        """ODV core settings (C3CS) as plain values."""
+        settings, utxo = self.get_odv_core_settings()
+        reward_prices = settings.fee_info.reward_prices
+        return {
+            "utxo": f"{utxo.input.transaction_id}#{utxo.input.index}",
+            "nodes": sorted(self.format_key_hash(pkh) for pkh in settings.nodes),
+            "required_signatures": settings.required_node_signatures_count,
+            "aggregation_liveness_period": settings.aggregation_liveness_period,
+            "time_uncertainty_aggregation": settings.time_uncertainty_aggregation,
+            "time_uncertainty_platform": settings.time_uncertainty_platform,
+            "iqr_fence_multiplier": settings.iqr_fence_multiplier,
+            "median_divergency_factor": settings.median_divergency_factor,
+            "utxo_size_safety_buffer": settings.utxo_size_safety_buffer,
+            "node_fee": reward_prices.node_fee,
+            "platform_fee": reward_prices.platform_fee,
+        }
+
+    def rewards_result(self):
+        """ODV reward-account (C3RA) snapshots oldest first, keyed by node PKH."""
+        return [
+            {
+                "utxo": f"{utxo.input.transaction_id}#{utxo.input.index}",
+                "output_index": utxo.input.index,
+                "created_at": created_at,
+                "accounts": {
+                    self.format_key_hash(node_pkh): reward
+                    for node_pkh, reward in reward_accounts.account_rewards.items()
+                },
+            }
+            for created_at, reward_accounts, utxo in self.get_odv_reward_account_entries()
+        ]
+
+    def display_odv_oracle_feed(self, limit=None):
+        """Display valid ODV aggregate-state feed UTxOs (the newest `limit`, if set)."""
+        feed_rows = self.result("feed", self.feed_result, limit=limit)
 
         feeds_table = Table(
             title="📊 CHARLI3 ODV - Aggregate States",
@@ -171,76 +490,76 @@ class Charli3NetworkInfoReader:
         feeds_table.add_column("Feed Value", style="bold cyan")
         feeds_table.add_column("Output Index", style="magenta")
 
-        for idx, (_, datum, utxo) in enumerate(feed_entries, start=1):
+        for idx, row in enumerate(feed_rows, start=1):
             feeds_table.add_row(
                 str(idx),
-                self.format_timestamp(datum.price_data.get_timestamp()),
-                self.format_timestamp(datum.price_data.get_expiry()),
-                f"{float(datum.price_data.get_price()) / 1000000:.6f}",
-                str(utxo.input.index),
+                self.format_timestamp(row["timestamp"]),
+                self.format_timestamp(row["expiry"]),
+                f"{float(row['price']) / 1000000:.6f}",
+                str(row["output_index"]),
             )
 
         console.print(Panel(feeds_table, border_style="blue", padding=(1, 2)))
 
     def display_odv_network_configuration(self):
         """Display the ODV core settings and all reward-account snapshots."""
-        network_settings, _ = self.get_odv_core_settings()
-        reward_entries = self.get_odv_reward_account_entries()
+        network_settings = self.result("settings", self.settings_result)
+        reward_entries = self.result("rewards", self.rewards_result)
 
         config_table = Table(title="⚙️  CHARLI3 ODV - Core Settings", show_header=False)
         config_table.add_row("Contract Address:", Text(str(self.network_address), style="cyan"))
         config_table.add_row(
             "Authorized Nodes:",
-            Text(str(len(network_settings.nodes)), style="green"),
+            Text(str(len(network_settings["nodes"])), style="green"),
         )
         config_table.add_row(
             "Required Signatures:",
-            Text(str(network_settings.required_node_signatures_count), style="magenta"),
+            Text(str(network_settings["required_signatures"]), style="magenta"),
         )
         config_table.add_row(
             "Aggregation Liveness:",
             Text(
-                f"{self.posixtime_to_min(network_settings.aggregation_liveness_period):.1f} min",
+                f"{self.posixtime_to_min(network_settings['aggregation_liveness_period']):.1f} min",
                 style="yellow",
             ),
         )
         config_table.add_row(
             "Aggregation Uncertainty:",
             Text(
-                f"{self.posixtime_to_min(network_settings.time_uncertainty_aggregation):.1f} min",
+                f"{self.posixtime_to_min(network_settings['time_uncertainty_aggregation']):.1f} min",
                 style="yellow",
             ),
         )
         config_table.add_row(
             "Platform Uncertainty:",
             Text(
-                f"{self.posixtime_to_min(network_settings.time_uncertainty_platform):.1f} min",
+                f"{self.posixtime_to_min(network_settings['time_uncertainty_platform']):.1f} min",
                 style="yellow",
             ),
         )
         config_table.add_row(
             "IQR Fence Multiplier:",
-            Text(str(network_settings.iqr_fence_multiplier), style="cyan"),
+            Text(str(network_settings["iqr_fence_multiplier"]), style="cyan"),
         )
         config_table.add_row(
             "Median Divergency Factor:",
             Text(
-                f"{network_settings.median_divergency_factor/1000:.3f}",
+                f"{network_settings['median_divergency_factor']/1000:.3f}",
                 style="cyan",
             ),
         )
         config_table.add_row(
             "UTxO Size Safety Buffer:",
-            Text(str(network_settings.utxo_size_safety_buffer), style="green"),
+            Text(str(network_settings["utxo_size_safety_buffer"]), style="green"),
         )
         config_table.add_row(
             "Node Fee:",
-            Text(str(network_settings.fee_info.reward_prices.node_fee), style="bold green"),
+            Text(str(network_settings["node_fee"]), style="bold green"),
         )
         config_table.add_row(
             "Platform Fee:",
             Text(
-                str(network_settings.fee_info.reward_prices.platform_fee),
+                str(network_settings["platform_fee"]),
                 style="bold green",
             ),
         )
@@ -250,11 +569,8 @@ class Charli3NetworkInfoReader:
         nodes_table = Table(title="🧾 CHARLI3 ODV - Node Registry", show_header=True)
         nodes_table.add_column("Node PKH", style="cyan")
 
-        for node_pkh in sorted(
-            network_settings.nodes,
-            key=self.format_key_hash,
-        ):
-            nodes_table.add_row(self.format_key_hash(node_pkh))
+        for node_pkh in network_settings["nodes"]:
+            nodes_table.add_row(node_pkh)
 
         console.print(Panel(nodes_table, border_style="blue", padding=(1, 2)))
 
@@ -268,38 +584,67 @@ class Charli3NetworkInfoReader:
         rewards_summary.add_column("Total Reward", style="bold cyan")
         rewards_summary.add_column("Output Index", style="yellow")
 
-        for idx, (created_at, reward_accounts, utxo) in enumerate(reward_entries, start=1):
+        for idx, entry in enumerate(reward_entries, start=1):
             rewards_summary.add_row(
                 str(idx),
-                self.format_timestamp(created_at),
-                str(len(reward_accounts.account_rewards)),
-                str(sum(reward_accounts.account_rewards.values())),
-                str(utxo.input.index),
+                self.format_timestamp(entry["created_at"]),
+                str(len(entry["accounts"])),
+                str(sum(entry["accounts"].values())),
+                str(entry["output_index"]),
             )
 
         console.print(Panel(rewards_summary, border_style="cyan", padding=(1, 2)))
 
-        for idx, (created_at, reward_accounts, _) in enumerate(reward_entries, start=1):
+        for idx, entry in enumerate(reward_entries, start=1):
             accounts_table = Table(
-                title=f"Reward Snapshot #{idx} - {self.format_timestamp(created_at)}",
+                title=f"Reward Snapshot #{idx} - {self.format_timestamp(entry['created_at'])}",
                 show_header=True,
             )
             accounts_table.add_column("Node PKH", style="cyan")
             accounts_table.add_column("Reward", style="bold green")
 
-            for node_pkh, reward in sorted(
-                reward_accounts.account_rewards.items(),
-                key=lambda item: self.format_key_hash(item[0]),
-            ):
-                accounts_table.add_row(self.format_key_hash(node_pkh), str(reward))
+            for node_pkh, reward in sorted(entry["accounts"].items()):
+                accounts_table.add_row(node_pkh, str(reward))
 
             console.print(Panel(accounts_table, border_style="magenta", padding=(1, 2)))
 
-    def display_oracle_feed(self):
+    def get_oracle_feed_utxo(self):
+        """Fetch the legacy `OracleFeed` UTxO."""
+        oracle_feed_utxo = next(
+            (
+                utxo
+                for utxo in self.iter_contract_utxos()
+                if self.utxo_has_asset(utxo, self.network_feed_nft)
+            ),
+            None,
+        )
+
+        if not oracle_feed_utxo:
+            raise ValueError("No Oracle Feed UTXO found matching the network feed NFT.")
+        return oracle_feed_utxo
+
+    def get_latest_price_data(self):
+        """Return the newest valid `PriceData` for either contract family."""
+        if self.is_odv():
+            feed_entries = self.get_valid_odv_feed_entries(limit=1)
+            if not feed_entries:
+                raise ValueError("No non-empty C3AS UTxOs found for this ODV contract.")
+            return feed_entries[-1][1].price_data
+
+        datum = self.get_oracle_feed_utxo().output.datum
+        if not datum or isinstance(datum, AggDatum) or not getattr(datum, "cbor", None):
+            raise ValueError("The Oracle Feed UTxO does not contain an inline datum.")
+        try:
+            return self.parse_feed_datum(datum.cbor).price_data
+        except Exception:
+            self.metrics.decode_error("GenericData")
+            raise
+
+    def display_oracle_feed(self, limit=None):
         """Get the oracle feed exchange rate."""
         if self.is_odv():
             try:
-                self.display_odv_oracle_feed()
+                self.display_odv_oracle_feed(limit)
             except ValueError as exc:
                 console.print(f"[red]Error retrieving oracle feed: {exc}[/red]")
             except Exception as exc:
@@ -309,57 +654,21 @@ class Charli3NetworkInfoReader:
             return
 
         try:
-            oracle_utxos = self.get_contract_utxos()
-
-            oracle_feed_utxo = next(
-                (
-                    utxo
-                    for utxo in oracle_utxos
-                    if self.utxo_has_asset(utxo, self.network_feed_nft)
-                ),
-                None,
-            )
-
-            if not oracle_feed_utxo:
-                raise ValueError(
-                    "No Oracle Feed UTXO found matching the network feed NFT."
-                )
-
-            try:
-                datum = oracle_feed_utxo.output.datum
-                datum_type = type(datum).__name__
-                console.print(f"[dim]Datum type: {datum_type}[/dim]")
+            feed = self.result("feed", self.feed_result)
+            console.print(f"[dim]Datum type: {feed['datum_type']}[/dim]")
 
-                if datum and not isinstance(datum, AggDatum):
-                    if hasattr(datum, "cbor") and datum.cbor:
-                        oracle_inline_datum = self.parse_feed_datum(datum.cbor)
+            if feed["price"] is not None:
+                price = float(feed["price"]) / 1000000
+                creation_time = self.format_timestamp(feed["timestamp"])
+                expiration_time = self.format_timestamp(feed["expiry"])
 
-                        price = float(oracle_inline_datum.price_data.get_price()) / 1000000
-                        creation_time = self.format_timestamp(
-                            oracle_inline_datum.price_data.get_timestamp()
-                        )
-                        expiration_time = self.format_timestamp(
-                            oracle_inline_datum.price_data.get_expiry()
-                        )
-
-                        table = Table(title="📊 CHARLI3 - Oracle Feed", show_header=False)
-                        table.add_row(
-                            "Last Price:", Text(f"${price:.6f}", style="bold cyan")
-                        )
-                        table.add_row(
-                            "Creation Time:", Text(creation_time, style="green")
-                        )
-                        table.add_row(
-                            "Expiration Time:", Text(expiration_time, style="yellow")
-                        )
+                table = Table(title="📊 CHARLI3 - Oracle Feed", show_header=False)
+                table.add_row("Last Price:", Text(f"${price:.6f}", style="bold cyan"))
+                table.add_row("Creation Time:", Text(creation_time, style="green"))
+                table.add_row("Expiration Time:", Text(expiration_time, style="yellow"))
 
-                        panel = Panel(table, border_style="blue", padding=(1, 2))
-                        console.print(panel)
-            except Exception as datum_error:
-                console.print(
-                    f"[red]Error parsing datum: {type(datum_error).__name__}: {datum_error}[/red]"
-                )
-                raise
+                panel = Panel(table, border_style="blue", padding=(1, 2))
+                console.print(panel)
 
         except ValueError as exc:
             console.print(f"[red]Error retrieving oracle feed: {exc}[/red]")
@@ -370,13 +679,17 @@ class Charli3NetworkInfoReader:
 
     def get_all_network_configurations(self):
         """Fetch all legacy aggregate UTxO configurations."""
+        return self.get_network_configurations_with_slots()[0]
+
+    def get_network_configurations_with_slots(self):
+        """Fetch all legacy aggregate UTxO configurations and their block slots."""
         try:
             aggregate_utxos = []
-            for utxo in self.get_contract_utxos():
+            for utxo in self.iter_contract_utxos():
                 if self.utxo_has_asset(utxo, self.aggregate_state_nft):
                     try:
-                        aggregate_state_inline_datum = AggDatum.from_cbor(
-                            utxo.output.datum.cbor
+                        aggregate_state_inline_datum = self.decode_datum(
+                            AggDatum, utxo.output.datum.cbor
                         )
                         aggregate_utxos.append(
                             (
@@ -386,6 +699,7 @@ class Charli3NetworkInfoReader:
                             )
                         )
                     except Exception as exc:
+                        self.metrics.decode_error("AggDatum")
                         console.print(
                             f"[yellow]Warning: Failed to parse aggregate UTxO: {exc}[/yellow]"
                         )
@@ -393,8 +707,18 @@ class Charli3NetworkInfoReader:
             if not aggregate_utxos:
                 raise ValueError("No matching Aggregate State UTxOs found.")
 
-            aggregate_utxos.sort(key=lambda item: str(item[0]))
-            return aggregate_utxos
+            # Order by the slot of the producing transaction; ids whose slot
+            # cannot be resolved sort first so they never count as latest.
+            slots = self.slot_resolver.resolve(tx_id for tx_id, _, _ in aggregate_utxos)
+            aggregate_utxos.sort(
+                key=lambda item: (
+                    slots[str(item[0])] is not None,
+                    slots[str(item[0])] or 0,
+                    str(item[0]),
+                    item[2].input.index,
+                )
+            )
+            return aggregate_utxos, slots
 
         except ValueError as exc:
             raise ValueError("Failed to fetch network configurations: " + str(exc))
@@ -407,7 +731,24 @@ class Charli3NetworkInfoReader:
     def get_network_configuration(self):
         """Fetch the most recent legacy aggregate UTxO configuration."""
         try:
-            aggregate_utxos = self.get_all_network_configurations()
+            aggregate_utxos, slots = self.get_network_configurations_with_slots()
+            unresolved = sum(
+                slots[str(tx_id)] is None for tx_id, _, _ in aggregate_utxos
+            )
+            if unresolved and len(aggregate_utxos) > 1:
+                if unresolved == len(aggregate_utxos):
+                    raise ValueError(
+                        f"cannot tell which of {len(aggregate_utxos)} Aggregate State "
+                        "UTxOs is the latest: no transaction slot could be resolved. "
+                        "Use Blockfrost or Kupo, or set kupo_url in the ogmios "
+                        "section of config.yaml."
+                    )
+                console.print(
+                    f"[bold yellow]Warning: slots of {unresolved} of "
+                    f"{len(aggregate_utxos)} Aggregate State transactions could not "
+                    "be resolved; the latest configuration is picked among the "
+                    "others.[/bold yellow]"
+                )
             return aggregate_utxos[-1][1]
 
         except (ValueError, IndexError) as exc:
@@ -439,19 +780,22 @@ class Charli3NetworkInfoReader:
             self.display_odv_network_configuration()
             return
 
-        aggregate_utxos = self.get_all_network_configurations()
+        aggregate_utxos, slots = self.get_network_configurations_with_slots()
 
         utxos_table = Table(
             title="📋 All Aggregate State UTxOs (Sorted by Creation Time)",
             show_header=True,
         )
         utxos_table.add_column("Index", style="cyan")
+        utxos_table.add_column("Slot", style="green")
         utxos_table.add_column("Transaction ID", style="magenta")
         utxos_table.add_column("Output Index", style="yellow")
 
         for idx, (tx_id, _, utxo) in enumerate(aggregate_utxos):
+            slot = slots[str(tx_id)]
             utxos_table.add_row(
                 str(idx + 1),
+                str(slot) if slot is not None else "unknown",
                 str(tx_id)[:16] + "...",
                 str(utxo.input.index),
             )
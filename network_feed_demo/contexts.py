@@ -0,0 +1,429 @@
+"""Read-only chain contexts for feed queries."""
+
+import json
+import threading
+from urllib.parse import urlparse
+
+import requests
+from blockfrost import ApiError, ApiUrls, BlockFrostApi
+from pycardano import (
+    Address,
+    MultiAsset,
+    Network,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+from pycardano.hash import DatumHash
+from pycardano.serialization import RawCBOR
+from websockets.exceptions import WebSocketException
+from websockets.sync.client import connect
+
+BLOCKFROST_PAGE_SIZE = 100
+POLICY_ID_HEX_LENGTH = 56
+
+
+def utxo_policies(utxo):
+    """Hex policy ids of the assets held by a UTxO."""
+    return {policy.payload.hex() for policy in utxo.output.amount.multi_asset or {}}
+
+
+def blockfrost_policies(result):
+    """Hex policy ids of the assets in a Blockfrost address-UTxO item."""
+    return {
+        item.unit[:POLICY_ID_HEX_LENGTH]
+        for item in result.amount
+        if item.unit != "lovelace"
+    }
+
+
+def blockfrost_utxo(address, result):
+    """Convert a Blockfrost address-UTxO item into a pycardano UTxO.
+
+    Unlike `BlockFrostChainContext.utxos`, reference scripts are not fetched:
+    feed queries only read values and datums.
+    """
+    lovelace = 0
+    primitive = {}
+    for item in result.amount:
+        if item.unit == "lovelace":
+            lovelace = int(item.quantity)
+            continue
+        unit = bytes.fromhex(item.unit)
+        primitive.setdefault(unit[: POLICY_ID_HEX_LENGTH // 2], {})[
+            unit[POLICY_ID_HEX_LENGTH // 2 :]
+        ] = int(item.quantity)
+
+    inline_datum = getattr(result, "inline_datum", None)
+    output = TransactionOutput(
+        Address.from_primitive(address),
+        Value(
+            lovelace,
+            MultiAsset.from_primitive(primitive) if primitive else MultiAsset(),
+        ),
+        datum_hash=DatumHash.from_primitive(result.data_hash)
+        if result.data_hash and inline_datum is None
+        else None,
+        datum=RawCBOR(bytes.fromhex(inline_datum)) if inline_datum else None,
+    )
+    return UTxO(
+        TransactionInput.from_primitive([result.tx_hash, result.output_index]), output
+    )
+
+
+def utxo_page(chain_context, address, page, policy_ids=None):
+    """One page of the UTxOs at `address` holding an asset of `policy_ids`.
+
+    Returns `(utxos, has_more)`, or None when the context cannot page.
+    Other UTxOs are dropped before they are converted. `policy_ids=None`
+    keeps every UTxO.
+    """
+    if hasattr(chain_context, "utxo_page"):
+        return chain_context.utxo_page(address, page, policy_ids)
+
+    api = getattr(chain_context, "api", None)
+    if api is None:
+        return None
+
+    try:
+        results = api.address_utxos(address, count=BLOCKFROST_PAGE_SIZE, page=page)
+    except ApiError as exc:
+        if exc.status_code == 404:
+            return [], False
+        raise
+    utxos = [
+        blockfrost_utxo(address, result)
+        for result in results
+        if policy_ids is None or blockfrost_policies(result) & policy_ids
+    ]
+    return utxos, len(results) == BLOCKFROST_PAGE_SIZE
+
+
+def iter_utxos(chain_context, address, policy_ids=None):
+    """Stream the UTxOs at `address` holding an asset of `policy_ids`.
+
+    Pages are fetched only as the caller consumes them, so peak memory is one
+    provider page plus what the caller keeps, and stopping early skips the
+    remaining pages. Contexts that cannot page are filtered after a full fetch.
+    """
+    page = 1
+    while True:
+        result = utxo_page(chain_context, address, page, policy_ids)
+        if result is None:
+            for utxo in chain_context.utxos(address):
+                if policy_ids is None or utxo_policies(utxo) & policy_ids:
+                    yield utxo
+            return
+
+        utxos, has_more = result
+        yield from utxos
+        if not has_more:
+            return
+        page += 1
+
+
+def kupo_assets(assets):
+    """Convert Kupo's `{"policy.name": qty}` map into a MultiAsset."""
+    primitive = {}
+    for asset, quantity in assets.items():
+        policy_hex, _, name_hex = asset.partition(".")
+        primitive.setdefault(bytes.fromhex(policy_hex), {})[
+            bytes.fromhex(name_hex)
+        ] = quantity
+    return MultiAsset.from_primitive(primitive) if primitive else MultiAsset()
+
+
+class KupoChainContext:
+    """Chain context that reads UTxOs straight from a Kupo index over HTTP."""
+
+    def __init__(
+        self, kupo_url: str, network: Network = Network.TESTNET, timeout: float = 30
+    ):
+        self.kupo_url = kupo_url.rstrip("/")
+        self.network = network
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/json"
+        self._datum_cache = {}
+
+    def get_json(self, path, params=None):
+        """GET a Kupo endpoint and decode its JSON body."""
+        response = self.session.get(
+            f"{self.kupo_url}{path}", params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def datum(self, datum_hash: str):
+        """Resolve an inline datum by hash (datums are immutable, so cache forever)."""
+        if datum_hash not in self._datum_cache:
+            result = self.get_json(f"/datums/{datum_hash}")
+            self._datum_cache[datum_hash] = (
+                bytes.fromhex(result["datum"]) if result else None
+            )
+        return self._datum_cache[datum_hash]
+
+    def utxo_from_match(self, match):
+        """Convert a Kupo match into a pycardano UTxO."""
+        datum = None
+        datum_hash = match.get("datum_hash")
+        if datum_hash and match.get("datum_type") == "inline":
+            datum_cbor = self.datum(datum_hash)
+            datum = RawCBOR(datum_cbor) if datum_cbor else None
+
+        output = TransactionOutput(
+            Address.from_primitive(match["address"]),
+            Value(match["value"]["coins"], kupo_assets(match["value"]["assets"])),
+            datum_hash=DatumHash.from_primitive(datum_hash)
+            if datum_hash and datum is None
+            else None,
+            datum=datum,
+        )
+        return UTxO(
+            TransactionInput.from_primitive(
+                [match["transaction_id"], match["output_index"]]
+            ),
+            output,
+        )
+
+    def utxo_page(self, address, page, policy_ids=None):
+        """Kupo answers in one page; a single policy is also filtered server-side."""
+        if page > 1:
+            return [], False
+
+        params = "unspent"
+        if policy_ids is not None and len(policy_ids) == 1:
+            params += f"&policy_id={next(iter(policy_ids))}"
+        matches = self.get_json(f"/matches/{address}", params=params)
+        utxos = [
+            self.utxo_from_match(match)
+            for match in matches
+            if match["spent_at"] is None
+            and (
+                policy_ids is None
+                or {asset.partition(".")[0] for asset in match["value"]["assets"]}
+                & policy_ids
+            )
+        ]
+        return utxos, False
+
+    def utxos(self, address):
+        """Return the unspent outputs at an address."""
+        matches = self.get_json(f"/matches/{address}", params="unspent")
+        return [
+            self.utxo_from_match(match)
+            for match in matches
+            if match["spent_at"] is None
+        ]
+
+    def transaction_slot(self, tx_id: str):
+        """Slot of the block that included a transaction, if Kupo indexed it."""
+        matches = self.get_json(f"/matches/*@{tx_id}")
+        return matches[0]["created_at"]["slot_no"] if matches else None
+
+    @property
+    def last_block_slot(self):
+        """Most recent slot Kupo has indexed."""
+        return self.get_json("/health")["most_recent_checkpoint"]
+
+    def close(self):
+        """Release the pooled HTTP connections."""
+        self.session.close()
+
+
+def ogmios_endpoint(ws_url: str):
+    """Split an Ogmios `ws://` / `wss://` URL into (host, port, path, secure)."""
+    parsed_ws_url = urlparse(ws_url)
+    if parsed_ws_url.scheme not in {"ws", "wss"} or not parsed_ws_url.hostname:
+        raise ValueError(
+            f"Invalid Ogmios ws_url: {ws_url}. Expected a ws:// or wss:// URL."
+        )
+
+    secure = parsed_ws_url.scheme == "wss"
+    port = parsed_ws_url.port
+    if port is None:
+        port = 443 if secure else 80
+    return parsed_ws_url.hostname, port, parsed_ws_url.path.lstrip("/"), secure
+
+
+def ogmios_policies(output):
+    """Hex policy ids of the assets in an Ogmios v6 JSON output."""
+    return set(output["value"]) - {"ada"}
+
+
+def ogmios_utxo(tx_id, index, output):
+    """Convert an Ogmios v6 JSON output into a pycardano UTxO."""
+    primitive = {
+        bytes.fromhex(policy): {
+            bytes.fromhex(name): quantity for name, quantity in names.items()
+        }
+        for policy, names in output["value"].items()
+        if policy != "ada"
+    }
+    datum = output.get("datum")
+    datum_hash = output.get("datumHash")
+    return UTxO(
+        TransactionInput.from_primitive([tx_id, index]),
+        TransactionOutput(
+            Address.from_primitive(output["address"]),
+            Value(
+                output["value"]["ada"]["lovelace"],
+                MultiAsset.from_primitive(primitive) if primitive else MultiAsset(),
+            ),
+            datum_hash=DatumHash.from_primitive(datum_hash)
+            if datum_hash and not datum
+            else None,
+            datum=RawCBOR(bytes.fromhex(datum)) if datum else None,
+        ),
+    )
+
+
+class BlockfrostReadContext:
+    """Read-only Blockfrost context that sends nothing until it is queried.
+
+    Unlike `BlockFrostChainContext`, construction does not fetch the latest
+    epoch, so a feed read costs only its UTxO pages.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        network: Network = Network.TESTNET,
+        base_url: str = None,
+    ):
+        self.project_id = project_id
+        self.network = network
+        self.base_url = base_url or (
+            ApiUrls.mainnet.value
+            if network == Network.MAINNET
+            else ApiUrls.preprod.value
+        )
+        self._api = None
+
+    @property
+    def api(self):
+        """Blockfrost client, created on first use."""
+        if self._api is None:
+            self._api = BlockFrostApi(
+                project_id=self.project_id, base_url=self.base_url
+            )
+        return self._api
+
+    def utxos(self, address):
+        """Return the unspent outputs at an address."""
+        return list(iter_utxos(self, str(address)))
+
+    @property
+    def last_block_slot(self):
+        """Slot of the latest block."""
+        return self.api.block_latest().slot
+
+    def close(self):
+        """Drop the client; Blockfrost requests hold no open connection."""
+        self._api = None
+
+
+class OgmiosReadContext:
+    """Read-only Ogmios context over one WebSocket opened on the first query.
+
+    `OgmiosChainContext` opens a new connection per query and asks for the
+    chain tip before every UTxO lookup. Here a feed read is one
+    `queryLedgerState/utxo` request on a connection that is reused until
+    `close`. Ogmios cannot tell which block included a transaction, so
+    transaction slots come from the Kupo companion at `kupo_url`, if given.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        network: Network = Network.TESTNET,
+        timeout: float = 30,
+        kupo_url: str = None,
+    ):
+        ogmios_endpoint(ws_url)
+        self.ws_url = ws_url
+        self.network = network
+        self.timeout = timeout
+        self.kupo = (
+            KupoChainContext(kupo_url, network=network, timeout=timeout)
+            if kupo_url
+            else None
+        )
+        self._connection = None
+        # One request in flight per connection; readers may share the context.
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def rpc(self, method, params=None):
+        """Send one Ogmios JSON-RPC request and return its result."""
+        request = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            request["params"] = params
+        with self._lock:
+            try:
+                if self._connection is None:
+                    # Ledger queries on busy addresses exceed the 1 MiB default.
+                    self._connection = connect(
+                        self.ws_url, max_size=None, open_timeout=self.timeout
+                    )
+                self._connection.send(json.dumps(request))
+                response = json.loads(self._connection.recv(timeout=self.timeout))
+            except (OSError, TimeoutError, WebSocketException) as exc:
+                self._close_connection()
+                raise ConnectionError(
+                    f"Could not query Ogmios at {self.ws_url}. "
+                    "Start the Ogmios service or update config.yaml."
+                ) from exc
+        if "error" in response:
+            raise ValueError(
+                f"Ogmios {method} failed: {response['error'].get('message')}"
+            )
+        return response["result"]
+
+    def utxo_page(self, address, page, policy_ids=None):
+        """Ogmios answers in one page; other policies are dropped before conversion."""
+        if page > 1:
+            return [], False
+
+        results = self.rpc("queryLedgerState/utxo", {"addresses": [str(address)]})
+        utxos = [
+            ogmios_utxo(result["transaction"]["id"], result["index"], result)
+            for result in results
+            if policy_ids is None or ogmios_policies(result) & policy_ids
+        ]
+        return utxos, False
+
+    def utxos(self, address):
+        """Return the unspent outputs at an address."""
+        return self.utxo_page(address, 1)[0]
+
+    @property
+    def last_block_slot(self):
+        """Slot of the node's chain tip."""
+        return self.rpc("queryNetwork/tip")["slot"]
+
+    def transaction_slot(self, tx_id: str):
+        """Slot of the block that included a transaction (None without Kupo)."""
+        if self.kupo is None:
+            return None
+        return self.kupo.transaction_slot(tx_id)
+
+    def _close_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            finally:
+                self._connection = None
+
+    def close(self):
+        """Close the WebSocket with a normal closure handshake."""
+        with self._lock:
+            self._close_connection()
+        if self.kupo is not None:
+            self.kupo.close()
@@ -0,0 +1,263 @@
+"""Cross-rate triangulation across the latest values of every feed.
+
+The newest valid value of each pair is loaded into dense asset-by-asset NumPy
+arrays. Every two-leg implied rate (for example BTC-ADA from BTC-USD and
+ADA-USD) and its divergence from a direct feed are then computed in one
+vectorized pass. Inverted pairs such as ADA-CHARLI3 / CHARLI3-ADA are used in
+both directions, and legs whose feed value has expired are flagged as stale.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+PRICE_SCALE = 1000000
+DEFAULT_TOLERANCE = 0.01
+
+
+def pair_assets(pair: str):
+    """(base, quote) of a `BASE-QUOTE` pair name, or None for other names."""
+    base, separator, quote = pair.partition("-")
+    if not separator or not base or not quote or "-" in quote:
+        return None
+    return base, quote
+
+
+def load_quotes(readers: dict, max_workers=8):
+    """Latest valid (price, timestamp, expiry) of every reader, read concurrently.
+
+    Returns `(quotes, errors)`, with the error message of each pair that
+    could not be read.
+    """
+
+    def read(reader):
+        try:
+            price_data = reader.get_latest_price_data()
+            return (
+                price_data.get_price(),
+                price_data.get_timestamp(),
+                price_data.get_expiry(),
+            ), None
+        except Exception as exc:
+            return None, f"{type(exc).__name__}: {exc}"
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(readers, pool.map(read, readers.values())))
+    quotes = {pair: quote for pair, (quote, _) in results.items() if quote}
+    errors = {pair: error for pair, (_, error) in results.items() if error}
+    return quotes, errors
+
+
+class RateMatrix:
+    """Feed values as dense arrays indexed by (base asset, quote asset).
+
+    `rate[i, j]` is the price of one `assets[i]` in `assets[j]`, taken from
+    the `i-j` feed or, failing that, the reciprocal of the `j-i` feed.
+    `direct` only holds the former. `timestamp`, `expiry` (POSIX ms) and
+    `source` describe the feed behind each rate; inverted legs are named
+    `1/<pair>`.
+    """
+
+    def __init__(self, quotes: dict):
+        self.quotes = {
+            pair: quote
+            for pair, quote in quotes.items()
+            if pair_assets(pair) is not None and quote[0]
+        }
+        self.assets = sorted(
+            {asset for pair in self.quotes for asset in pair_assets(pair)}
+        )
+        index = {asset: position for position, asset in enumerate(self.assets)}
+        size = len(self.assets)
+        self.rate = np.full((size, size), np.nan)
+        self.direct = np.full((size, size), np.nan)
+        self.timestamp = np.full((size, size), np.nan)
+        self.expiry = np.full((size, size), np.nan)
+        self.source = np.full((size, size), "", dtype=object)
+
+        # Inverted legs first, so a direct feed always wins its cell.
+        for inverted in (True, False):
+            for pair, (price, timestamp, expiry) in self.quotes.items():
+                base, quote = pair_assets(pair)
+                i, j = index[base], index[quote]
+                value = price / PRICE_SCALE
+                if inverted:
+                    i, j, value, pair = j, i, 1 / value, f"1/{pair}"
+                else:
+                    self.direct[i, j] = value
+                self.rate[i, j] = value
+                self.timestamp[i, j] = timestamp
+                self.expiry[i, j] = expiry
+                self.source[i, j] = pair
+
+
+class CrossRateReport:
+    """Implied rates, divergences and stale legs of one triangulation pass."""
+
+    def __init__(self, matrix, now_ms, tolerance, elapsed, errors=None):
+        self.matrix = matrix
+        self.now_ms = now_ms
+        self.tolerance = tolerance
+        self.elapsed = elapsed
+        self.errors = errors or {}
+        self.implied = []
+        self.inverse = []
+
+    @property
+    def stale_pairs(self):
+        """Feeds whose latest value has expired."""
+        return sorted(
+            pair
+            for pair, (_, _, expiry) in self.matrix.quotes.items()
+            if expiry < self.now_ms
+        )
+
+    @property
+    def divergences(self):
+        """Implied rates that differ from a direct feed by more than `tolerance`."""
+        return [entry for entry in self.implied if entry["flagged"]] + [
+            entry for entry in self.inverse if entry["flagged"]
+        ]
+
+
+def triangulate(matrix: RateMatrix, now_ms=None, tolerance=DEFAULT_TOLERANCE):
+    """Compute every two-leg implied rate of a matrix in one vectorized pass.
+
+    `implied[i, j, k] = rate[i, k] * rate[k, j]` is the price of asset `i` in
+    asset `j` via `k`. It is compared with the direct `i-j` feed, and pairs
+    quoted in both directions are checked against each other.
+    """
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    started = time.perf_counter()
+
+    rate = matrix.rate.copy()
+    np.fill_diagonal(rate, np.nan)
+    stale = matrix.expiry < now_ms
+    implied = rate[:, None, :] * rate.T[None, :, :]
+    # One orientation per asset pair: the direct feed's, else alphabetical.
+    has_direct = np.isfinite(matrix.direct)
+    keep = has_direct | (~has_direct.T & np.triu(np.ones_like(has_direct), 1))
+    implied[~keep] = np.nan
+    path_stale = stale[:, None, :] | stale.T[None, :, :]
+    path_timestamp = np.minimum(
+        matrix.timestamp[:, None, :], matrix.timestamp.T[None, :, :]
+    )
+    path_expiry = np.minimum(matrix.expiry[:, None, :], matrix.expiry.T[None, :, :])
+    with np.errstate(invalid="ignore"):
+        divergence = implied / matrix.direct[:, :, None] - 1
+        inverse = matrix.direct * matrix.direct.T - 1
+    flagged = np.abs(divergence) > tolerance
+    inverse_flagged = np.abs(inverse) > tolerance
+
+    report = CrossRateReport(matrix, now_ms, tolerance, 0.0)
+    assets = matrix.assets
+    for i, j, k in np.argwhere(np.isfinite(implied)):
+        direct = matrix.direct[i, j]
+        report.implied.append(
+            {
+                "pair": f"{assets[i]}-{assets[j]}",
+                "via": assets[k],
+                "legs": [matrix.source[i, k], matrix.source[k, j]],
+                "rate": float(implied[i, j, k]),
+                "direct": None if np.isnan(direct) else float(direct),
+                "divergence": (
+                    None if np.isnan(direct) else float(divergence[i, j, k])
+                ),
+                "flagged": bool(flagged[i, j, k]),
+                "stale": bool(path_stale[i, j, k]),
+                "timestamp": int(path_timestamp[i, j, k]),
+                "expiry": int(path_expiry[i, j, k]),
+            }
+        )
+    for i, j in np.argwhere(np.isfinite(inverse)):
+        if i > j:
+            continue
+        report.inverse.append(
+            {
+                "pair": matrix.source[i, j],
+                "inverse": matrix.source[j, i],
+                "product": float(matrix.direct[i, j] * matrix.direct[j, i]),
+                "divergence": float(inverse[i, j]),
+                "flagged": bool(inverse_flagged[i, j]),
+                "stale": bool(stale[i, j] or stale[j, i]),
+            }
+        )
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def cross_rates(readers: dict, now_ms=None, tolerance=DEFAULT_TOLERANCE):
+    """Load the latest value of every reader and triangulate them."""
+    quotes, errors = load_quotes(readers)
+    report = triangulate(RateMatrix(quotes), now_ms, tolerance)
+    report.errors = errors
+    return report
+
+
+def format_divergence(divergence):
+    """Relative divergence as a signed percentage."""
+    return "-" if divergence is None else f"{divergence * 100:+.3f}%"
+
+
+def display_cross_rates(report: CrossRateReport, environment: str):
+    """Print feeds, implied cross rates and inverse-pair checks as tables."""
+    feeds = Table(title=f"Charli3 feeds ({environment})", show_header=True)
+    for column in ("Pair", "Price", "Created", "Expires", "Status"):
+        feeds.add_column(column)
+    for pair, (price, timestamp, expiry) in sorted(report.matrix.quotes.items()):
+        feeds.add_row(
+            pair,
+            f"{price / PRICE_SCALE:.6f}",
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp / 1000)),
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(expiry / 1000)),
+            "[yellow]STALE[/yellow]" if expiry < report.now_ms else "[green]OK[/green]",
+        )
+    for pair, error in sorted(report.errors.items()):
+        feeds.add_row(pair, "-", "-", "-", f"[red]{error}[/red]")
+    console.print(feeds)
+
+    rates = Table(title="Implied cross rates", show_header=True)
+    for column in ("Pair", "Via", "Legs", "Implied", "Direct", "Divergence", "Status"):
+        rates.add_column(column)
+    for entry in sorted(report.implied, key=lambda item: (item["pair"], item["via"])):
+        status = []
+        if entry["flagged"]:
+            status.append("[red]DIVERGES[/red]")
+        if entry["stale"]:
+            status.append("[yellow]STALE LEG[/yellow]")
+        rates.add_row(
+            entry["pair"],
+            entry["via"],
+            " x ".join(entry["legs"]),
+            f"{entry['rate']:.8g}",
+            "-" if entry["direct"] is None else f"{entry['direct']:.8g}",
+            format_divergence(entry["divergence"]),
+            " ".join(status) or "[green]OK[/green]",
+        )
+    console.print(rates)
+
+    if report.inverse:
+        inverse = Table(title="Inverse pairs", show_header=True)
+        for column in ("Pair", "Inverse", "Product", "Divergence", "Status"):
+            inverse.add_column(column)
+        for entry in report.inverse:
+            inverse.add_row(
+                entry["pair"],
+                entry["inverse"],
+                f"{entry['product']:.6f}",
+                format_divergence(entry["divergence"]),
+                "[red]DIVERGES[/red]" if entry["flagged"] else "[green]OK[/green]",
+            )
+        console.print(inverse)
+
+    console.print(
+        f"[dim]{len(report.implied)} implied rate(s) from "
+        f"{len(report.matrix.quotes)} feed(s) in {report.elapsed * 1000:.2f} ms; "
+        f"{len(report.divergences)} beyond ±{report.tolerance * 100:g}%, "
+        f"{len(report.stale_pairs)} stale feed(s)[/dim]"
+    )
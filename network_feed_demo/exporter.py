@@ -0,0 +1,74 @@
+"""Prometheus exporter for long-running Charli3 feed monitoring."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rich.console import Console
+
+from .metrics import REGISTRY
+
+console = Console()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the registry in the Prometheus text format."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle `GET /metrics`."""
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep scrapes out of the console."""
+
+
+def start_metrics_server(host: str, port: int):
+    """Start the metrics endpoint on a background thread."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def poll_reader(pair: str, reader):
+    """Read the latest feed value of one pair and record it."""
+    try:
+        price_data = reader.get_latest_price_data()
+        reader.metrics.observe_feed(price_data)
+        reader.metrics.poll_succeeded()
+    except Exception as exc:
+        reader.metrics.poll_failed()
+        console.print(f"[red]Error polling {pair}: {type(exc).__name__}: {exc}[/red]")
+
+
+def run_exporter(readers: dict, host: str, port: int, interval: float):
+    """Poll every reader each `interval` seconds and serve the results."""
+    server = start_metrics_server(host, port)
+    console.print(
+        f"[green]Serving metrics for {len(readers)} pair(s) on "
+        f"http://{host}:{port}/metrics every {interval:g}s[/green]"
+    )
+
+    try:
+        while True:
+            started = time.monotonic()
+            for pair, reader in readers.items():
+                poll_reader(pair, reader)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
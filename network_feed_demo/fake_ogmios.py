@@ -0,0 +1,327 @@
+"""Local stand-in for the Ogmios mempool-monitoring protocol.
+
+Replays a sequence of mempool snapshots over Ogmios' JSON-RPC WebSocket
+interface (`acquireMempool`, `nextTransaction`, `hasTransaction`,
+`sizeOfMempool`, `releaseMempool`) and answers the ledger-state queries of
+the read-only Ogmios context from a fake chain state. Every transaction
+leaving the replayed mempool is applied to that state. With
+`--provider-port`, a fake Blockfrost/Kupo provider is served from the same
+state, so pending feed values become confirmed end to end.
+"""
+
+import argparse
+import json
+import threading
+import time
+
+import yaml
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve
+
+from .contexts import ogmios_utxo
+from .datums import GenericData, PriceData
+from .fake_server import (
+    add_fake_server_arguments,
+    build_fake_server,
+    build_fake_state,
+    synthetic_tx_id,
+)
+
+SNAPSHOT_WAIT_SECONDS = 1.0
+
+
+def ogmios_transaction(tx_id, spent_refs, outputs):
+    """Ogmios v6 JSON transaction with the given inputs and outputs."""
+    return {
+        "id": tx_id,
+        "inputs": [
+            {"transaction": {"id": ref.split("#")[0]}, "index": int(ref.split("#")[1])}
+            for ref in spent_refs
+        ],
+        "outputs": outputs,
+    }
+
+
+def ogmios_output(address, policy, asset_name, datum_cbor, lovelace=2_000_000):
+    """Ogmios v6 JSON output holding one NFT and an inline datum."""
+    return {
+        "address": address,
+        "value": {
+            "ada": {"lovelace": lovelace},
+            policy: {asset_name.hex(): 1},
+        },
+        "datum": datum_cbor.hex(),
+    }
+
+
+def synthetic_mempool_snapshots(network_files, count, base_price, interval):
+    """One new feed transaction per pair and snapshot, each spending the previous.
+
+    The first transaction of a pair spends the synthetic provider's
+    OracleFeed (legacy) or oldest C3AS (ODV) output.
+    """
+    now_ms = int(time.time() * 1000)
+    snapshots = [[] for _ in range(count)]
+    for network_file in network_files:
+        with open(network_file, "r", encoding="UTF-8") as c3_networks_yaml:
+            c3_networks = yaml.load(c3_networks_yaml, Loader=yaml.FullLoader)
+        for pair, entry in c3_networks.items():
+            odv = entry.get("category") == "charli3-odv"
+            asset_name = b"C3AS" if odv else b"OracleFeed"
+            previous = (
+                f"{synthetic_tx_id(pair, 'C3AS', 0)}#0"
+                if odv
+                else f"{synthetic_tx_id(pair, 'OracleFeed')}#0"
+            )
+            price = base_price + sum(pair.encode()) * 1000
+            for position, snapshot in enumerate(snapshots):
+                created = now_ms + int(position * interval * 1000)
+                datum = GenericData(
+                    PriceData(
+                        {
+                            0: price + (position + 1) * 1000,
+                            1: created,
+                            2: created + 3600000,
+                        }
+                    )
+                ).to_cbor()
+                tx_id = synthetic_tx_id(pair, "mempool", now_ms, position)
+                snapshot.append(
+                    ogmios_transaction(
+                        tx_id,
+                        [previous],
+                        [
+                            ogmios_output(
+                                entry["address"],
+                                entry["minting-policy"],
+                                asset_name,
+                                datum,
+                            )
+                        ],
+                    )
+                )
+                previous = f"{tx_id}#0"
+    return snapshots
+
+
+def transaction_utxos(tx):
+    """UTxOs produced by an Ogmios JSON transaction."""
+    return [
+        ogmios_utxo(tx["id"], index, output)
+        for index, output in enumerate(tx.get("outputs", []))
+    ]
+
+
+def transaction_spent_refs(tx):
+    """`tx_id#index` references spent by an Ogmios JSON transaction."""
+    return [
+        f"{tx_input['transaction']['id']}#{tx_input['index']}"
+        for tx_input in tx.get("inputs", [])
+    ]
+
+
+class MempoolReplay:
+    """Timeline of mempool snapshots, advanced every `interval` seconds.
+
+    After the last snapshot the mempool is empty. `on_block` receives the
+    transactions that left the mempool before the next snapshot is shown.
+    """
+
+    def __init__(self, snapshots, interval, on_block=None, slot=0):
+        self.snapshots = list(snapshots) + [[]]
+        self.interval = interval
+        self.on_block = on_block
+        self.position = 0
+        self.slot = slot
+        self.stopped = threading.Event()
+        self._cond = threading.Condition()
+
+    def advance(self):
+        """Move to the next snapshot. Returns False once the replay is over."""
+        with self._cond:
+            if self.position + 1 >= len(self.snapshots):
+                return False
+            current = self.snapshots[self.position]
+            next_ids = {tx["id"] for tx in self.snapshots[self.position + 1]}
+        leaving = [tx for tx in current if tx["id"] not in next_ids]
+        if self.on_block is not None and leaving:
+            self.on_block(leaving)
+        with self._cond:
+            self.position += 1
+            self.slot += 20
+            self._cond.notify_all()
+        return True
+
+    def wait_for_change(self, seen_position):
+        """Block like `acquireMempool` until a snapshot other than `seen_position`."""
+        with self._cond:
+            while self.position == seen_position and not self.stopped.is_set():
+                self._cond.wait(SNAPSHOT_WAIT_SECONDS)
+            return self.position, self.slot, self.snapshots[self.position]
+
+    def run(self):
+        """Advance through the snapshots until the end or `stop`."""
+        while not self.stopped.wait(self.interval) and self.advance():
+            pass
+
+    def stop(self):
+        """Stop advancing and release blocked `acquireMempool` calls."""
+        self.stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+
+def ledger_state_result(state, method, params):
+    """Result of a ledger-state or network query, or None for other methods."""
+    if method == "queryLedgerState/utxo":
+        return [
+            state.ogmios_utxo(address, utxo)
+            for address in params.get("addresses", [])
+            for utxo in state.utxos_by_address.get(address, [])
+        ]
+    if method == "queryNetwork/tip":
+        return {"slot": state.tip_slot, "id": "0" * 64, "height": state.tip_slot // 20}
+    return None
+
+
+def handle_connection(connection, replay, state=None):
+    """Serve mempool monitoring (and ledger queries) on one WebSocket connection."""
+    acquired = None
+    cursor = 0
+
+    def reply(request, result=None, error=None):
+        response = {"jsonrpc": "2.0", "method": request.get("method")}
+        response.update({"error": error} if error else {"result": result})
+        response["id"] = request.get("id")
+        connection.send(json.dumps(response))
+
+    try:
+        for message in connection:
+            request = json.loads(message)
+            method = request.get("method")
+            params = request.get("params") or {}
+            result = (
+                ledger_state_result(state, method, params)
+                if state is not None
+                else None
+            )
+            if result is not None:
+                reply(request, result)
+            elif method == "acquireMempool":
+                acquired = replay.wait_for_change(
+                    None if acquired is None else acquired[0]
+                )
+                cursor = 0
+                reply(request, {"acquired": "mempool", "slot": acquired[1]})
+            elif acquired is None and method in (
+                "nextTransaction",
+                "hasTransaction",
+                "sizeOfMempool",
+                "releaseMempool",
+            ):
+                reply(
+                    request,
+                    error={"code": 4000, "message": "Must acquire a mempool first."},
+                )
+            elif method == "nextTransaction":
+                transactions = acquired[2]
+                tx = transactions[cursor] if cursor < len(transactions) else None
+                cursor += 1
+                if tx is not None and params.get("fields") != "all":
+                    tx = {"id": tx["id"]}
+                reply(request, {"transaction": tx})
+            elif method == "hasTransaction":
+                reply(request, any(tx["id"] == params.get("id") for tx in acquired[2]))
+            elif method == "sizeOfMempool":
+                size = sum(len(json.dumps(tx)) for tx in acquired[2])
+                reply(
+                    request,
+                    {
+                        "maxCapacity": {"bytes": 180224},
+                        "currentSize": {"bytes": size},
+                        "transactions": {"count": len(acquired[2])},
+                    },
+                )
+            elif method == "releaseMempool":
+                acquired = None
+                reply(request, {"released": "mempool"})
+            else:
+                reply(request, error={"code": -32601, "message": "Method not found"})
+    except ConnectionClosed:
+        pass
+
+
+def start_fake_ogmios(replay, host="127.0.0.1", port=0, state=None):
+    """Serve a replay on a background thread and start advancing it."""
+    server = serve(
+        lambda connection: handle_connection(connection, replay, state), host, port
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=replay.run, daemon=True).start()
+    return server
+
+
+def main():
+    """Run the Ogmios mempool stand-in in the foreground."""
+    parser = argparse.ArgumentParser(
+        prog="charli3-fake-ogmios",
+        description="Local Ogmios mempool stand-in replaying mempool snapshots",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address")
+    parser.add_argument("--port", type=int, default=1337, help="Ogmios listen port")
+    parser.add_argument(
+        "--mempool-snapshots",
+        help="JSON list of snapshots, each a list of Ogmios v6 transactions",
+    )
+    parser.add_argument(
+        "--count", type=int, default=10, help="Synthetic snapshots to replay"
+    )
+    parser.add_argument(
+        "--block-interval",
+        type=float,
+        default=5.0,
+        help="Seconds each snapshot stays in the mempool",
+    )
+    parser.add_argument(
+        "--provider-port",
+        type=int,
+        help="Also serve a fake Blockfrost/Kupo provider that confirms the replay",
+    )
+    add_fake_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.mempool_snapshots:
+        with open(args.mempool_snapshots, "r", encoding="UTF-8") as snapshots_file:
+            snapshots = json.load(snapshots_file)
+    else:
+        snapshots = synthetic_mempool_snapshots(
+            args.networks, args.count, args.base_price, args.block_interval
+        )
+
+    state = build_fake_state(args)
+    provider = None
+    if args.provider_port is not None:
+        provider = build_fake_server(args, args.host, args.provider_port, state)
+
+    def on_block(transactions):
+        for tx in transactions:
+            state.apply_transaction(transaction_spent_refs(tx), transaction_utxos(tx))
+
+    replay = MempoolReplay(snapshots, args.block_interval, on_block, state.tip_slot)
+    server = start_fake_ogmios(replay, args.host, args.port, state)
+    print(f"Ogmios ws_url: ws://{args.host}:{args.port}")
+    if provider is not None:
+        host, port = provider.server_address[:2]
+        print(f"Blockfrost base_url: http://{host}:{port}/api")
+        print(f"Kupo url:            http://{host}:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        replay.stop()
+        server.shutdown()
+        if provider is not None:
+            provider.shutdown()
+
+
+if __name__ == "__main__":
+    main()
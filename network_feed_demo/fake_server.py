@@ -0,0 +1,623 @@
+"""Local stand-in for the Blockfrost and Kupo endpoints used by the reader.
+
+Serves synthetic or snapshot-replayed UTxO sets for the addresses in the
+`*-c3-networks.yaml` files, with configurable latency, jitter, error rate
+and rate limits, so load tests never touch paid or rate-limited services.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import yaml
+from pycardano import (
+    Address,
+    MultiAsset,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+from pycardano.serialization import IndefiniteList, RawCBOR
+
+from .datums import (
+    AggDatum,
+    AggState,
+    FeeConfig,
+    GenericData,
+    NoDatum,
+    OraclePlatform,
+    OracleSettings,
+    OracleSettingsDatum,
+    OracleSettingsVariant,
+    PriceData,
+    PriceRewards,
+    RewardAccounts,
+    RewardAccountsDatum,
+    RewardPrices,
+)
+from .provider_client import TokenBucket
+from .snapshot import SnapshotChainContext
+
+BLOCKFROST_PREFIX = "/api/v0"
+SLOT_ZERO_TIME = 1655769600  # preprod Shelley-era slot reference, good enough for fakes
+
+def synthetic_tx_id(*parts):
+    """Deterministic 32-byte transaction id for synthetic UTxOs."""
+    return hashlib.sha256("/".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def datum_hash(datum_cbor: bytes) -> str:
+    """Blake2b-256 datum hash, as reported by Blockfrost and Kupo."""
+    return hashlib.blake2b(datum_cbor, digest_size=32).hexdigest()
+
+
+def synthetic_node_pkhs(pair, count):
+    """Deterministic node key hashes for a pair."""
+    return [
+        hashlib.blake2b(f"{pair}/node/{idx}".encode(), digest_size=28).digest()
+        for idx in range(count)
+    ]
+
+
+def make_utxo(
+    address, tx_id, index, policy, asset_name, datum=None, lovelace=2_000_000
+):
+    """Build a UTxO holding an optional Charli3 NFT and inline datum."""
+    multi_asset = (
+        MultiAsset.from_primitive({bytes.fromhex(policy): {asset_name: 1}})
+        if asset_name
+        else MultiAsset()
+    )
+    output = TransactionOutput(
+        Address.from_primitive(address),
+        Value(lovelace, multi_asset),
+        datum=RawCBOR(datum) if datum else None,
+    )
+    return UTxO(TransactionInput.from_primitive([tx_id, index]), output)
+
+
+def synthetic_pair_utxos(pair, entry, options, now_ms):
+    """Synthetic UTxOs shaped like the live contract of a pair."""
+    address = entry["address"]
+    policy = entry["minting-policy"]
+    price = options.base_price + sum(pair.encode()) * 1000
+    nodes = synthetic_node_pkhs(pair, options.nodes)
+    utxos = []
+
+    if entry.get("category") == "charli3-odv":
+        for idx in range(options.feeds):
+            created = now_ms - (options.feeds - idx) * 60000
+            datum = GenericData(
+                PriceData({0: price + idx, 1: created, 2: created + 3600000})
+            ).to_cbor()
+            utxos.append(
+                make_utxo(
+                    address,
+                    synthetic_tx_id(pair, "C3AS", idx),
+                    0,
+                    policy,
+                    b"C3AS",
+                    datum,
+                )
+            )
+        for idx in range(options.placeholders):
+            utxos.append(
+                make_utxo(
+                    address,
+                    synthetic_tx_id(pair, "C3AS-empty", idx),
+                    0,
+                    policy,
+                    b"C3AS",
+                    NoDatum().to_cbor(),
+                )
+            )
+        settings = OracleSettingsVariant(
+            OracleSettingsDatum(
+                IndefiniteList(nodes),
+                max(1, len(nodes) // 2 + 1),
+                FeeConfig(NoDatum(), RewardPrices(1000, 500)),
+                300000,
+                120000,
+                120000,
+                2,
+                50,
+                2000000,
+                NoDatum(),
+            )
+        ).to_cbor()
+        utxos.append(
+            make_utxo(
+                address, synthetic_tx_id(pair, "C3CS"), 0, policy, b"C3CS", settings
+            )
+        )
+        for idx in range(options.reward_snapshots):
+            rewards = RewardAccountsDatum(
+                RewardAccounts(
+                    {pkh: 1000 * (idx + 1) + pos for pos, pkh in enumerate(nodes)},
+                    now_ms - (options.reward_snapshots - idx) * 3600000,
+                )
+            ).to_cbor()
+            utxos.append(
+                make_utxo(
+                    address,
+                    synthetic_tx_id(pair, "C3RA", idx),
+                    0,
+                    policy,
+                    b"C3RA",
+                    rewards,
+                )
+            )
+    else:
+        datum = GenericData(
+            PriceData({0: price, 1: now_ms - 60000, 2: now_ms + 3540000})
+        ).to_cbor()
+        utxos.append(
+            make_utxo(
+                address,
+                synthetic_tx_id(pair, "OracleFeed"),
+                0,
+                policy,
+                b"OracleFeed",
+                datum,
+            )
+        )
+        for idx in range(options.aggregate_states):
+            settings = OracleSettings(
+                IndefiniteList(nodes),
+                6000,
+                3600000,
+                300000,
+                100,
+                1000000000,
+                600000,
+                PriceRewards(1000, 2000, 500),
+                150,
+                500,
+                OraclePlatform(IndefiniteList(nodes[:1]), 1),
+            )
+            utxos.append(
+                make_utxo(
+                    address,
+                    synthetic_tx_id(pair, "AggState", idx),
+                    0,
+                    policy,
+                    b"AggState",
+                    AggDatum(AggState(settings)).to_cbor(),
+                )
+            )
+
+    for idx in range(options.dust):
+        utxos.append(
+            make_utxo(
+                address, synthetic_tx_id(pair, "dust", idx), idx % 4, policy, None
+            )
+        )
+    return utxos
+
+
+class FakeChainState:
+    """UTxO sets served by the fake endpoints, indexed by address."""
+
+    def __init__(self, utxos_by_address, tip_slot):
+        self.utxos_by_address = utxos_by_address
+        self.tip_slot = tip_slot
+        self.datums = {}
+        self.slots = {}
+        self.utxos_by_tx = {}
+        for utxos in utxos_by_address.values():
+            # Later outputs of an address were produced in later blocks.
+            for position, utxo in enumerate(utxos):
+                tx_id = str(utxo.input.transaction_id)
+                self.slots.setdefault(tx_id, tip_slot - (len(utxos) - position) * 20)
+                self.utxos_by_tx.setdefault(tx_id, []).append(utxo)
+                datum = utxo.output.datum
+                if datum is not None:
+                    self.datums[datum_hash(datum.cbor)] = datum.cbor
+
+    @classmethod
+    def synthetic(cls, network_files, options):
+        """Build synthetic UTxO sets for every pair of the given network files."""
+        now_ms = int(time.time() * 1000)
+        utxos_by_address = {}
+        for network_file in network_files:
+            with open(network_file, "r", encoding="UTF-8") as c3_networks_yaml:
+                c3_networks = yaml.load(c3_networks_yaml, Loader=yaml.FullLoader)
+            for pair, entry in c3_networks.items():
+                utxos_by_address.setdefault(entry["address"], []).extend(
+                    synthetic_pair_utxos(pair, entry, options, now_ms)
+                )
+        return cls(utxos_by_address, int(time.time()) - SLOT_ZERO_TIME)
+
+    @classmethod
+    def from_snapshot(cls, path):
+        """Serve the UTxO sets captured in a snapshot file."""
+        snapshot_context = SnapshotChainContext(path)
+        utxos_by_address = {
+            address: snapshot_context.utxos(address)
+            for address in set(snapshot_context.pairs.values())
+        }
+        tip_slot = snapshot_context.last_block_slot or 0
+        recorded_slots = snapshot_context.header.get("slots", {})
+        snapshot_context.close()
+        state = cls(utxos_by_address, tip_slot)
+        state.slots.update(recorded_slots)
+        return state
+
+    def apply_transaction(self, spent_refs, produced):
+        """Include a transaction in a new block: spend its inputs, add its outputs.
+
+        Address lists are replaced rather than mutated so concurrent requests
+        keep a consistent view.
+        """
+        self.tip_slot += 20
+        spent_refs = set(spent_refs)
+        for address, utxos in list(self.utxos_by_address.items()):
+            remaining = [
+                utxo
+                for utxo in utxos
+                if f"{utxo.input.transaction_id}#{utxo.input.index}" not in spent_refs
+            ]
+            if len(remaining) != len(utxos):
+                self.utxos_by_address[address] = remaining
+        for utxo in produced:
+            address = str(utxo.output.address)
+            self.utxos_by_address[address] = self.utxos_by_address.get(address, []) + [
+                utxo
+            ]
+        for utxo in produced:
+            tx_id = str(utxo.input.transaction_id)
+            self.slots[tx_id] = self.tip_slot
+            self.utxos_by_tx.setdefault(tx_id, []).append(utxo)
+            if utxo.output.datum is not None:
+                self.datums[datum_hash(utxo.output.datum.cbor)] = utxo.output.datum.cbor
+
+    def blockfrost_utxo(self, address, utxo):
+        """Render a UTxO as a Blockfrost `/addresses/{address}/utxos` item."""
+        output = utxo.output
+        amount = [{"unit": "lovelace", "quantity": str(output.amount.coin)}]
+        for policy, assets in (output.amount.multi_asset or {}).items():
+            for asset_name, quantity in assets.items():
+                amount.append(
+                    {
+                        "unit": policy.payload.hex() + asset_name.payload.hex(),
+                        "quantity": str(quantity),
+                    }
+                )
+        datum = output.datum
+        return {
+            "address": address,
+            "tx_hash": str(utxo.input.transaction_id),
+            "tx_index": utxo.input.index,
+            "output_index": utxo.input.index,
+            "amount": amount,
+            "block": "0" * 64,
+            "data_hash": datum_hash(datum.cbor) if datum is not None else None,
+            "inline_datum": datum.cbor.hex() if datum is not None else None,
+            "reference_script_hash": None,
+        }
+
+    def ogmios_utxo(self, address, utxo):
+        """Render a UTxO as an Ogmios v6 `queryLedgerState/utxo` item."""
+        output = utxo.output
+        value = {"ada": {"lovelace": output.amount.coin}}
+        for policy, assets in (output.amount.multi_asset or {}).items():
+            value[policy.payload.hex()] = {
+                asset_name.payload.hex(): quantity
+                for asset_name, quantity in assets.items()
+            }
+        item = {
+            "transaction": {"id": str(utxo.input.transaction_id)},
+            "index": utxo.input.index,
+            "address": address,
+            "value": value,
+        }
+        if output.datum is not None:
+            item["datum"] = output.datum.cbor.hex()
+        return item
+
+    def kupo_match(self, address, utxo):
+        """Render a UTxO as a Kupo `/matches` item."""
+        output = utxo.output
+        assets = {}
+        for policy, policy_assets in (output.amount.multi_asset or {}).items():
+            for asset_name, quantity in policy_assets.items():
+                name = asset_name.payload.hex()
+                assets[
+                    f"{policy.payload.hex()}.{name}" if name else policy.payload.hex()
+                ] = quantity
+        datum = output.datum
+        return {
+            "transaction_index": 0,
+            "transaction_id": str(utxo.input.transaction_id),
+            "output_index": utxo.input.index,
+            "address": address,
+            "value": {"coins": output.amount.coin, "assets": assets},
+            "datum_hash": datum_hash(datum.cbor) if datum is not None else None,
+            "datum_type": "inline" if datum is not None else None,
+            "script_hash": None,
+            "created_at": {
+                "slot_no": self.slots[str(utxo.input.transaction_id)],
+                "header_hash": "0" * 64,
+            },
+            "spent_at": None,
+        }
+
+
+class FaultInjector:
+    """Latency, jitter, error-rate and rate-limit behaviour of the fake provider."""
+
+    def __init__(
+        self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit=None, burst=None
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.bucket = (
+            TokenBucket(rate_limit, burst or max(1, int(rate_limit)))
+            if rate_limit
+            else None
+        )
+
+    def apply(self):
+        """Delay the request and return an HTTP error status to inject, if any."""
+        if self.bucket is not None and not self.bucket.try_acquire():
+            return 429
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            return 500
+        return None
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Blockfrost (`/api/v0/...`) and Kupo (`/matches`, `/datums`) routes."""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status, payload):
+        """Write a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_failure(self, status, message):
+        """Write a Blockfrost-style error body (Kupo clients only read the status)."""
+        errors = {
+            404: "Not Found",
+            429: "Project Over Limit",
+            500: "Internal Server Error",
+        }
+        self.send_json(
+            status,
+            {
+                "status_code": status,
+                "error": errors.get(status, "Error"),
+                "message": message,
+            },
+        )
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Route a GET request."""
+        state = self.server.state
+        injected = self.server.faults.apply()
+        if injected is not None:
+            self.send_failure(injected, "Injected by the fake provider.")
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+
+        if url.path.startswith(BLOCKFROST_PREFIX):
+            self.route_blockfrost(state, parts[2:], query)
+        else:
+            self.route_kupo(state, parts, query)
+
+    def route_blockfrost(self, state, parts, query):
+        """Serve the Blockfrost endpoints touched by a read-only chain context."""
+        now = int(time.time())
+        if parts == ["epochs", "latest"]:
+            self.send_json(
+                200,
+                {
+                    "epoch": 500,
+                    "start_time": now - 3600,
+                    "end_time": now + 5 * 86400,
+                    "first_block_time": now - 3600,
+                    "last_block_time": now,
+                    "block_count": 1,
+                    "tx_count": 1,
+                },
+            )
+        elif parts == ["blocks", "latest"]:
+            self.send_json(
+                200,
+                {"slot": state.tip_slot, "height": state.tip_slot // 20, "time": now},
+            )
+        elif len(parts) == 2 and parts[0] == "txs" and parts[1] in state.slots:
+            slot = state.slots[parts[1]]
+            self.send_json(
+                200,
+                {
+                    "hash": parts[1],
+                    "block": "0" * 64,
+                    "block_height": slot // 20,
+                    "block_time": SLOT_ZERO_TIME + slot,
+                    "slot": slot,
+                    "index": 0,
+                },
+            )
+        elif len(parts) == 3 and parts[0] == "addresses" and parts[2] == "utxos":
+            address = parts[1]
+            utxos = state.utxos_by_address.get(address)
+            if utxos is None:
+                self.send_failure(404, "The requested component has not been found.")
+                return
+            count = min(int(query.get("count", ["100"])[0]), 100)
+            page = max(int(query.get("page", ["1"])[0]), 1)
+            items = utxos[::-1] if query.get("order", ["asc"])[0] == "desc" else utxos
+            window = items[(page - 1) * count : page * count]
+            self.send_json(
+                200, [state.blockfrost_utxo(address, utxo) for utxo in window]
+            )
+        else:
+            self.send_failure(404, "The requested component has not been found.")
+
+    def route_kupo(self, state, parts, query):
+        """Serve the Kupo endpoints used for UTxO and datum lookups."""
+        if parts == ["health"]:
+            self.send_json(
+                200,
+                {
+                    "connection_status": "connected",
+                    "most_recent_checkpoint": state.tip_slot,
+                },
+            )
+        elif len(parts) == 2 and parts[0] == "matches" and parts[1].startswith("*@"):
+            utxos = state.utxos_by_tx.get(parts[1][2:], [])
+            self.send_json(
+                200,
+                [state.kupo_match(str(utxo.output.address), utxo) for utxo in utxos],
+            )
+        elif len(parts) == 2 and parts[0] == "matches":
+            address = parts[1]
+            policy_id = query.get("policy_id", [None])[0]
+            utxos = state.utxos_by_address.get(address, [])
+            matches = [state.kupo_match(address, utxo) for utxo in utxos]
+            if policy_id:
+                matches = [
+                    match
+                    for match in matches
+                    if any(
+                        asset.split(".")[0] == policy_id
+                        for asset in match["value"]["assets"]
+                    )
+                ]
+            self.send_json(200, matches)
+        elif len(parts) == 2 and parts[0] == "datums":
+            datum = state.datums.get(parts[1])
+            self.send_json(200, {"datum": datum.hex()} if datum else None)
+        else:
+            self.send_failure(404, "Unknown route.")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence per-request logging, which would dominate load tests."""
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake chain state and fault settings."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, state, faults):
+        super().__init__(address, FakeProviderHandler)
+        self.state = state
+        self.faults = faults
+
+
+def start_fake_server(state, faults, host="127.0.0.1", port=0):
+    """Start a fake provider on a background thread and return the server."""
+    server = FakeProviderServer((host, port), state, faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fake_server_arguments(parser):
+    """Arguments describing the served data and the injected faults."""
+    parser.add_argument(
+        "--networks",
+        nargs="+",
+        default=["preprod-c3-networks.yaml", "mainnet-c3-networks.yaml"],
+        help="Network definition files whose addresses are served",
+    )
+    parser.add_argument("--snapshot", help="Serve the UTxOs of a snapshot file instead")
+    parser.add_argument(
+        "--feeds", type=int, default=10, help="Valid C3AS UTxOs per ODV pair"
+    )
+    parser.add_argument(
+        "--placeholders", type=int, default=5, help="Empty C3AS UTxOs per ODV pair"
+    )
+    parser.add_argument(
+        "--reward-snapshots", type=int, default=3, help="C3RA UTxOs per ODV pair"
+    )
+    parser.add_argument(
+        "--aggregate-states", type=int, default=3, help="AggState UTxOs per legacy pair"
+    )
+    parser.add_argument(
+        "--nodes", type=int, default=9, help="Authorized nodes per pair"
+    )
+    parser.add_argument("--dust", type=int, default=0, help="Unrelated UTxOs per pair")
+    parser.add_argument(
+        "--base-price",
+        type=int,
+        default=450000,
+        help="Base synthetic price (1e6 scale)",
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Fixed latency per request"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0.0, help="Uniform extra latency per request"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests failing with 500",
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, help="Requests per second before answering 429"
+    )
+    parser.add_argument("--burst", type=int, help="Burst size of the rate limit")
+    return parser
+
+
+def build_fake_state(args):
+    """Chain state from parsed `add_fake_server_arguments` options."""
+    if args.snapshot:
+        return FakeChainState.from_snapshot(args.snapshot)
+    return FakeChainState.synthetic(args.networks, args)
+
+
+def build_fake_server(args, host, port, state=None):
+    """Start a fake provider from parsed `add_fake_server_arguments` options."""
+    faults = FaultInjector(
+        args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.burst
+    )
+    return start_fake_server(state or build_fake_state(args), faults, host, port)
+
+
+def main():
+    """Run the fake provider in the foreground."""
+    parser = argparse.ArgumentParser(
+        prog="charli3-fake-server",
+        description="Local Blockfrost/Kupo stand-in for Charli3 load tests",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address")
+    parser.add_argument("--port", type=int, default=3000, help="Listen port")
+    add_fake_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = build_fake_server(args, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Blockfrost base_url: http://{host}:{port}/api")
+    print(f"Kupo url:            http://{host}:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Load-test driver for Charli3 reads against a (fake) provider.
+
+Reports throughput and latency percentiles for three scenarios:
+
+* `single`: every worker reads the same pair back to back.
+* `batch`: every iteration reads all selected pairs.
+* `long-running`: each pair is polled on a fixed interval, like the exporter.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from pycardano import Address, Network
+from rich.console import Console
+from rich.table import Table
+
+from .charli3_network_info_reader import Charli3NetworkInfoReader
+from .contexts import BlockfrostReadContext, KupoChainContext
+from .fake_server import add_fake_server_arguments, build_fake_server
+from .provider_client import rate_limited
+
+console = Console()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadResult:
+    """Latencies and failures collected by one scenario."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        """Record one read."""
+        with self._lock:
+            if ok:
+                self.latencies.append(latency)
+            else:
+                self.errors += 1
+
+    def summary(self):
+        """Throughput and latency percentiles (milliseconds)."""
+        latencies = sorted(self.latencies)
+        total = len(latencies) + self.errors
+        return {
+            "reads": total,
+            "errors": self.errors,
+            "throughput": total / self.elapsed if self.elapsed else float("nan"),
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p90": percentile(latencies, 0.90) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": (latencies[-1] if latencies else float("nan")) * 1000,
+            "mean": (statistics.fmean(latencies) if latencies else float("nan")) * 1000,
+        }
+
+
+def timed_read(reader, result):
+    """Read the latest feed value of a reader and record the outcome."""
+    started = time.perf_counter()
+    try:
+        reader.get_latest_price_data()
+        ok = True
+    except Exception:
+        ok = False
+    result.record(time.perf_counter() - started, ok)
+
+
+def run_single(readers, pair, concurrency, requests_total):
+    """Hammer one pair with `requests_total` reads across `concurrency` workers."""
+    result = LoadResult(f"single ({pair})")
+    reader = readers[pair]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(requests_total):
+            pool.submit(timed_read, reader, result)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_batch(readers, concurrency, iterations):
+    """Read every pair `iterations` times, all pairs of an iteration in parallel."""
+    result = LoadResult(f"batch ({len(readers)} pairs)")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(iterations):
+            list(pool.map(lambda reader: timed_read(reader, result), readers.values()))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_long_running(readers, interval, duration):
+    """Poll each pair every `interval` seconds for `duration` seconds."""
+    result = LoadResult(f"long-running ({interval:g}s interval)")
+    deadline = time.monotonic() + duration
+
+    def poll(reader):
+        while time.monotonic() < deadline:
+            cycle = time.monotonic()
+            timed_read(reader, result)
+            time.sleep(max(0.0, interval - (time.monotonic() - cycle)))
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=poll, args=(reader,)) for reader in readers.values()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def build_readers(provider, url, network_file, pairs, client_limits=None):
+    """Readers for the selected pairs, all sharing one context.
+
+    With `client_limits` (`rate`, `burst`), the context goes through the
+    rate-limit-aware provider client.
+    """
+    with open(network_file, "r", encoding="UTF-8") as c3_networks_yaml:
+        c3_networks = yaml.load(c3_networks_yaml, Loader=yaml.FullLoader)
+    network = Network.MAINNET if network_file.startswith("mainnet") else Network.TESTNET
+
+    if provider == "blockfrost":
+        chain_context = BlockfrostReadContext(
+            project_id="loadtest", network=network, base_url=f"{url}/api"
+        )
+    else:
+        chain_context = KupoChainContext(url, network=network)
+
+    if client_limits:
+        chain_context = rate_limited(chain_context, provider, client_limits)
+
+    return {
+        pair: Charli3NetworkInfoReader(
+            Address.from_primitive(c3_networks[pair]["address"]),
+            c3_networks[pair]["minting-policy"],
+            chain_context,
+            category=c3_networks[pair].get("category", "charli3-network-feed"),
+        )
+        for pair in (pairs or list(c3_networks))
+    }
+
+
+def print_results(results):
+    """Render scenario summaries as a table."""
+    table = Table(title="Charli3 load test", show_header=True)
+    for column in (
+        "Scenario",
+        "Reads",
+        "Errors",
+        "Reads/s",
+        "p50 ms",
+        "p90 ms",
+        "p99 ms",
+        "max ms",
+    ):
+        table.add_column(column)
+    for result in results:
+        summary = result.summary()
+        table.add_row(
+            result.name,
+            str(summary["reads"]),
+            str(summary["errors"]),
+            f"{summary['throughput']:.1f}",
+            f"{summary['p50']:.1f}",
+            f"{summary['p90']:.1f}",
+            f"{summary['p99']:.1f}",
+            f"{summary['max']:.1f}",
+        )
+    console.print(table)
+
+
+def main():
+    """Run the load-test scenarios."""
+    parser = argparse.ArgumentParser(
+        prog="charli3-loadtest",
+        description="Throughput and latency of Charli3 reads",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=["blockfrost", "kupo"],
+        default="blockfrost",
+        help="Protocol used to talk to the provider",
+    )
+    parser.add_argument(
+        "--url",
+        help="Provider root URL; when omitted an in-process fake server is started",
+    )
+    parser.add_argument(
+        "--environment",
+        choices=["preprod", "mainnet"],
+        default="preprod",
+        help="Network definitions to read",
+    )
+    parser.add_argument("--pairs", nargs="*", help="Pairs to read (default: all)")
+    parser.add_argument(
+        "--scenario",
+        choices=["single", "batch", "long-running", "all"],
+        default="all",
+        help="Scenario to run",
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Worker threads")
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Reads in the single scenario"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=20, help="Iterations of the batch scenario"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="Poll interval of long-running"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Length of long-running"
+    )
+    parser.add_argument(
+        "--client-rate",
+        type=float,
+        help="Route reads through the rate-limited client at this many requests/s",
+    )
+    parser.add_argument(
+        "--client-burst", type=int, help="Burst of the client token bucket"
+    )
+    add_fake_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = build_fake_server(args, "127.0.0.1", 0)
+        host, port = server.server_address[:2]
+        url = f"http://{host}:{port}"
+        console.print(f"[dim]Started fake provider on {url}[/dim]")
+
+    try:
+        client_limits = (
+            {"rate": args.client_rate, "burst": args.client_burst}
+            if args.client_rate
+            else None
+        )
+        readers = build_readers(
+            args.provider,
+            url,
+            f"{args.environment}-c3-networks.yaml",
+            args.pairs,
+            client_limits,
+        )
+        results = []
+        if args.scenario in ("single", "all"):
+            results.append(
+                run_single(
+                    readers, next(iter(readers)), args.concurrency, args.requests
+                )
+            )
+        if args.scenario in ("batch", "all"):
+            results.append(run_batch(readers, args.concurrency, args.iterations))
+        if args.scenario in ("long-running", "all"):
+            results.append(run_long_running(readers, args.interval, args.duration))
+        print_results(results)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
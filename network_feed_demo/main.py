@@ -2,20 +2,35 @@
 
 import argparse
 import logging
+import os
 import sys
-import warnings
-from urllib.parse import urlparse
 
-# Suppress noisy dependency warnings before importing pycardano/blockfrost.
-warnings.filterwarnings(
-    "ignore",
-    message=".*network.*argument will be deprecated.*",
-)
 logging.getLogger("ogmios").setLevel(logging.ERROR)
 
 import yaml
-from pycardano import BlockFrostChainContext, OgmiosChainContext, Address, Network
-from .charli3_network_info_reader import Charli3NetworkInfoReader
+from pycardano import Address, Network
+from .charli3_network_info_reader import Charli3NetworkInfoReader, UtxoCache
+from .contexts import BlockfrostReadContext, KupoChainContext, OgmiosReadContext
+from .crossrates import DEFAULT_TOLERANCE, cross_rates, display_cross_rates
+from .exporter import run_exporter
+from .mempool import (
+    MempoolMonitor,
+    connect_mempool,
+    run_mempool,
+    start_mempool_monitor,
+)
+from .metrics import ReaderMetrics
+from .node_index import DEFAULT_INDEX_PATH, NodeIndex, build_index, display_node
+from .provider_client import rate_limited
+from .result_broker import (
+    DEFAULT_RESULT_TTL,
+    DEFAULT_SOCKET_PATH,
+    ResultBroker,
+    ResultClient,
+    run_result_broker,
+)
+from .snapshot import SnapshotChainContext, write_snapshot
+from .stream import EventBroker, run_stream
 
 
 def create_parser():
@@ -44,16 +59,119 @@ def add_arguments(parser):
 
     parser.add_argument(
         "--action",
-        choices=["feed", "configuration", "all-configurations"],
+        choices=[
+            "feed",
+            "configuration",
+            "all-configurations",
+            "exporter",
+            "stream",
+            "mempool",
+            "crossrates",
+            "snapshot",
+            "index",
+            "cache-broker",
+        ],
         default="feed",
         help="Retrieve the oracle feed for the specified token pair",
     )
     parser.add_argument(
         "--service",
-        choices=["blockfrost", "ogmios"],
+        choices=["blockfrost", "ogmios", "kupo"],
         default="blockfrost",
         help="External service to read blockhain information",
     )
+    parser.add_argument(
+        "--all-pairs",
+        action="store_true",
+        help="Use every pair in the network definitions instead of token_pair",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address the long-running endpoints listen on",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=9108,
+        help="Port the long-running endpoints listen on",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30.0,
+        help="Seconds between polls in long-running modes",
+    )
+    parser.add_argument(
+        "--mempool",
+        action="store_true",
+        help="Also stream pending feed values from the Ogmios mempool",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Relative divergence flagged by --action crossrates (0.01 = 1%%)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="K",
+        help="Only decode and show the K newest ODV feed values",
+    )
+    parser.add_argument(
+        "--latest",
+        action="store_const",
+        const=1,
+        dest="limit",
+        help="Only decode and show the newest ODV feed value (same as --limit 1)",
+    )
+    parser.add_argument(
+        "--out",
+        help="Snapshot file written by --action snapshot",
+    )
+    parser.add_argument(
+        "--index-file",
+        default=DEFAULT_INDEX_PATH,
+        help="Node index file maintained by --action index",
+    )
+    parser.add_argument(
+        "--broker-socket",
+        default=DEFAULT_SOCKET_PATH,
+        help="Unix socket of the result cache broker (--action cache-broker)",
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=DEFAULT_RESULT_TTL,
+        help="Seconds the cache broker reuses a result (--action cache-broker)",
+    )
+    parser.add_argument(
+        "--no-broker",
+        action="store_true",
+        help="Always read directly instead of asking a running cache broker",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Read UTxOs from a snapshot file instead of a live service",
+    )
+    return parser
+
+
+def create_node_parser():
+    """Initialize and return the `charli3 node <pkh>` parser."""
+    parser = argparse.ArgumentParser(
+        prog="python charli3 node",
+        description="Look up the feeds and rewards of a node in the node index",
+        epilog="Copyright: (c) 2020 - 2024 Charli3",
+    )
+    parser.add_argument("pkh", help="Node public key hash (hex)")
+    parser.add_argument(
+        "--index-file",
+        default=DEFAULT_INDEX_PATH,
+        help="Node index file maintained by --action index",
+    )
     return parser
 
 
@@ -67,6 +185,21 @@ def load_config():
         sys.exit(1)
 
 
+def environment_config(config, environment):
+    """Provider sections used for one environment.
+
+    Sections nested under `preprod:` or `mainnet:` override the top-level
+    ones, which are shared by every environment.
+    """
+    return {**config, **(config.get(environment) or {})}
+
+
+def has_environment_config(config, environment, service):
+    """Whether `config` has a provider section of its own for `environment`."""
+    section = "ogmios" if service == "kupo" else service
+    return section in (config.get(environment) or {})
+
+
 def validate_config(config, service, required_keys):
     """Validates that all required keys exist for a service configuration."""
     if service not in config or not all(
@@ -75,12 +208,23 @@ def validate_config(config, service, required_keys):
         raise ValueError(f"Context for {service} not found or is incomplete.")
 
 
-def context(args):
+def context(args, environment=None):
     """Connection context"""
-    configyaml = load_config()
+    environment = environment or args.environment
+
+    if args.replay:
+        snapshot_context = SnapshotChainContext(args.replay)
+        if snapshot_context.environment != environment:
+            raise ValueError(
+                f"Snapshot {args.replay} was captured on "
+                f"{snapshot_context.environment}, not {environment}."
+            )
+        return snapshot_context
+
+    configyaml = environment_config(load_config(), environment)
 
     network = None
-    if args.environment == "preprod":
+    if environment == "preprod":
         network = Network.TESTNET
     else:
         network = Network.MAINNET
@@ -89,84 +233,336 @@ def context(args):
         required_keys = ["project_id"]
         validate_config(configyaml, args.service, required_keys)
 
-        return BlockFrostChainContext(
-            project_id=configyaml[args.service].get("project_id", ""),
-            network=network,
-            base_url=None,
+        return rate_limited(
+            BlockfrostReadContext(
+                project_id=configyaml[args.service].get("project_id", ""),
+                network=network,
+                base_url=configyaml[args.service].get("base_url"),
+            ),
+            args.service,
+            configyaml[args.service].get("rate_limit"),
         )
     elif args.service == "ogmios":
-        required_keys = ["kupo_url", "ws_url"]
+        required_keys = ["ws_url"]
         validate_config(configyaml, args.service, required_keys)
 
-        ogmios_ws_url = configyaml["ogmios"]["ws_url"]
-        parsed_ws_url = urlparse(ogmios_ws_url)
-
-        if parsed_ws_url.scheme not in {"ws", "wss"} or not parsed_ws_url.hostname:
-            raise ValueError(
-                f"Invalid Ogmios ws_url: {ogmios_ws_url}. "
-                "Expected a ws:// or wss:// URL."
-            )
-
-        port = parsed_ws_url.port
-        if port is None:
-            port = 443 if parsed_ws_url.scheme == "wss" else 80
-
-        try:
-            return OgmiosChainContext(
-                host=parsed_ws_url.hostname,
-                port=port,
-                secure=parsed_ws_url.scheme == "wss",
+        return rate_limited(
+            OgmiosReadContext(
+                configyaml["ogmios"]["ws_url"],
                 network=network,
-            )
-        except ConnectionRefusedError as exc:
-            raise ConnectionError(
-                f"Could not connect to Ogmios at {ogmios_ws_url}. "
-                "Start the Ogmios/Kupo services or update config.yaml."
-            ) from exc
+                kupo_url=configyaml["ogmios"].get("kupo_url"),
+            ),
+            args.service,
+            configyaml[args.service].get("rate_limit"),
+        )
+    elif args.service == "kupo":
+        required_keys = ["kupo_url"]
+        validate_config(configyaml, "ogmios", required_keys)
+
+        return rate_limited(
+            KupoChainContext(configyaml["ogmios"]["kupo_url"], network=network),
+            args.service,
+            configyaml["ogmios"].get("rate_limit"),
+        )
     else:
         raise ValueError(f"Service {args.service} is not supported.")
 
 
-def display(args):
-    """Display the C3 network information"""
+def load_networks(environment):
+    """Loads the C3 network definitions for an environment."""
     try:
         with open(
-            f"{args.environment}-c3-networks.yaml", "r", encoding="UTF-8"
+            f"{environment}-c3-networks.yaml", "r", encoding="UTF-8"
         ) as c3_networks_yaml:
-            c3_networks = yaml.load(c3_networks_yaml, Loader=yaml.FullLoader)
+            return yaml.load(c3_networks_yaml, Loader=yaml.FullLoader)
     except FileNotFoundError:
         sys.exit(1)
-    if args.token_pair not in c3_networks or (
-        "address" not in c3_networks[args.token_pair]
-        or "minting-policy" not in c3_networks[args.token_pair]
+
+
+def network_entry(c3_networks, token_pair):
+    """Return the network definition of a token pair, validating its keys."""
+    if token_pair not in c3_networks or (
+        "address" not in c3_networks[token_pair]
+        or "minting-policy" not in c3_networks[token_pair]
     ):
-        raise ValueError(f"Token pair {args.token_pair} not found in the network.")
+        raise ValueError(f"Token pair {token_pair} not found in the network.")
+    return c3_networks[token_pair]
 
-    address = Address.from_primitive(c3_networks.get(args.token_pair).get("address"))
-    minting_policy = c3_networks.get(args.token_pair)["minting-policy"]
-    category = c3_networks.get(args.token_pair).get(
-        "category", "charli3-network-feed"
-    )
 
-    reader = Charli3NetworkInfoReader(
+def selected_pairs(args, c3_networks):
+    """Token pairs an action should run against."""
+    pairs = list(c3_networks) if args.all_pairs else [args.token_pair]
+    for pair in pairs:
+        network_entry(c3_networks, pair)
+    return pairs
+
+
+def create_reader(token_pair, c3_networks, chain_context, **reader_options):
+    """Build a reader for a token pair from the network definitions."""
+    entry = network_entry(c3_networks, token_pair)
+    address = Address.from_primitive(entry.get("address"))
+    minting_policy = entry["minting-policy"]
+    category = entry.get("category", "charli3-network-feed")
+
+    return Charli3NetworkInfoReader(
         address,
         minting_policy,
-        context(args),
+        chain_context,
         category=category,
+        **reader_options,
+    )
+
+
+def monitoring_readers(args, c3_networks):
+    """Instrumented readers for the long-running exporter and stream actions."""
+    pairs = selected_pairs(args, c3_networks)
+    chain_context = context(args)
+    # Pairs sharing a contract address reuse one fetch per polling cycle.
+    utxo_cache = UtxoCache(ttl=args.interval / 2)
+    return {
+        pair: create_reader(
+            pair,
+            c3_networks,
+            chain_context,
+            metrics=ReaderMetrics(args.service, args.environment, pair),
+            utxo_cache=utxo_cache,
+        )
+        for pair in pairs
+    }
+
+
+def export_metrics(args, c3_networks):
+    """Serve Prometheus metrics for the selected pairs."""
+    run_exporter(
+        monitoring_readers(args, c3_networks), args.host, args.port, args.interval
+    )
+
+
+def mempool_ws_url(environment):
+    """Ogmios WebSocket URL used for mempool monitoring."""
+    configyaml = environment_config(load_config(), environment)
+    validate_config(configyaml, "ogmios", ["ws_url"])
+    return configyaml["ogmios"]["ws_url"]
+
+
+def stream_changes(args, c3_networks):
+    """Stream datum changes of the selected pairs as Server-Sent Events."""
+    readers = monitoring_readers(args, c3_networks)
+    broker = EventBroker()
+    if args.mempool:
+        start_mempool_monitor(
+            MempoolMonitor(
+                connect_mempool(mempool_ws_url(args.environment)),
+                readers,
+                listener=lambda pending: broker.publish(
+                    args.environment, pending.pair, "pending", pending.payload()
+                ),
+            )
+        )
+    run_stream(readers, args.environment, args.host, args.port, args.interval, broker)
+
+
+def watch_mempool(args, c3_networks):
+    """Print pending feed values of the selected pairs from the Ogmios mempool."""
+    ws_url = mempool_ws_url(args.environment)
+    chain_context = context(args)
+    readers = {
+        pair: create_reader(pair, c3_networks, chain_context)
+        for pair in selected_pairs(args, c3_networks)
+    }
+    run_mempool(connect_mempool(ws_url), readers, ws_url)
+
+
+def show_cross_rates(args, c3_networks):
+    """Triangulate the latest values of every pair of the environment."""
+    if args.tolerance <= 0:
+        raise ValueError("--tolerance must be positive.")
+
+    chain_context = context(args)
+    # Pairs sharing a contract address reuse one fetch.
+    utxo_cache = UtxoCache(ttl=60)
+    readers = {
+        pair: create_reader(pair, c3_networks, chain_context, utxo_cache=utxo_cache)
+        for pair in selected_pairs(args, c3_networks)
+    }
+    try:
+        report = cross_rates(readers, tolerance=args.tolerance)
+    finally:
+        chain_context.close()
+    display_cross_rates(report, args.environment)
+
+
+def capture_snapshot(args, c3_networks):
+    """Write the raw UTxO sets of the selected pairs to a snapshot file."""
+    if not args.out:
+        raise ValueError("--action snapshot requires --out FILE.")
+
+    pairs = {
+        pair: network_entry(c3_networks, pair)["address"]
+        for pair in selected_pairs(args, c3_networks)
+    }
+    chain_context = context(args)
+    try:
+        counts = write_snapshot(
+            args.out, chain_context, pairs, args.environment, args.service
+        )
+    finally:
+        chain_context.close()
+    print(
+        f"Wrote {sum(counts.values())} UTxOs from {len(counts)} address(es) "
+        f"for {len(pairs)} pair(s) to {args.out}"
+    )
+
+
+def served_environments(args):
+    """`--environment`, plus the other networks with provider config of their own.
+
+    A top-level provider section only answers for `--environment`, so one
+    provider never serves two networks.
+    """
+    configyaml = load_config()
+    return [args.environment] + [
+        environment
+        for environment in ("preprod", "mainnet")
+        if environment != args.environment
+        and os.path.exists(f"{environment}-c3-networks.yaml")
+        and has_environment_config(configyaml, environment, args.service)
+    ]
+
+
+def index_nodes(args):
+    """Build or incrementally refresh the node PKH index."""
+    environments = [args.environment] if args.replay else served_environments(args)
+
+    readers = {}
+    for environment in environments:
+        c3_networks = load_networks(environment)
+        chain_context = context(args, environment)
+        # The fingerprint and the decode pass share one fetch per address.
+        utxo_cache = UtxoCache(ttl=60)
+        for pair, entry in c3_networks.items():
+            readers[(environment, pair)] = (
+                entry.get("category", "charli3-network-feed"),
+                create_reader(pair, c3_networks, chain_context, utxo_cache=utxo_cache),
+            )
+
+    build_index(NodeIndex.load(args.index_file), readers)
+
+
+def serve_results(args):
+    """Serve decoded results to local CLI processes over a Unix socket."""
+    if args.replay:
+        raise ValueError("--action cache-broker reads live services only.")
+
+    environments = {}
+
+    def reader_factory(environment, pair):
+        # Called by the broker one at a time.
+        if environment not in environments:
+            if not os.path.exists(f"{environment}-c3-networks.yaml"):
+                raise ValueError(f"Environment {environment} is not configured.")
+            environments[environment] = (
+                load_networks(environment),
+                context(args, environment),
+                # Result kinds of one pair share one fetch.
+                UtxoCache(ttl=args.ttl / 2),
+            )
+        c3_networks, chain_context, utxo_cache = environments[environment]
+        return create_reader(pair, c3_networks, chain_context, utxo_cache=utxo_cache)
+
+    run_result_broker(
+        ResultBroker(
+            reader_factory,
+            args.ttl,
+            service=args.service,
+            environments=served_environments(args),
+        ),
+        args.broker_socket,
     )
 
-    if args.action == "feed":
-        reader.display_oracle_feed()
-    elif args.action == "configuration":
-        reader.display_network_configuration()
-    elif args.action == "all-configurations":
-        reader.display_all_network_configurations()
+
+def display(args):
+    """Display the C3 network information"""
+    c3_networks = load_networks(args.environment)
+    if args.limit is not None and args.limit < 1:
+        raise ValueError("--limit must be at least 1.")
+
+    if args.action == "exporter":
+        export_metrics(args, c3_networks)
+        return
+    if args.action == "stream":
+        stream_changes(args, c3_networks)
+        return
+    if args.action == "mempool":
+        watch_mempool(args, c3_networks)
+        return
+    if args.action == "crossrates":
+        args.all_pairs = True
+        show_cross_rates(args, c3_networks)
+        return
+    if args.action == "snapshot":
+        capture_snapshot(args, c3_networks)
+        return
+    if args.action == "index":
+        index_nodes(args)
+        return
+    if args.action == "cache-broker":
+        serve_results(args)
+        return
+
+    pairs = selected_pairs(args, c3_networks)
+    chain_context = context(args)
+    results_client = (
+        None
+        if args.replay or args.no_broker
+        else ResultClient(args.broker_socket, service=args.service)
+    )
+
+    try:
+        for pair in pairs:
+            reader = create_reader(
+                pair,
+                c3_networks,
+                chain_context,
+                results=results_client.bind(args.environment, pair)
+                if results_client
+                else None,
+            )
+
+            if args.action == "feed":
+                if args.limit is not None and not reader.is_odv():
+                    print(
+                        f"Warning: --limit/--latest only applies to ODV feeds; "
+                        f"{pair} has a single OracleFeed value.",
+                        file=sys.stderr,
+                    )
+                reader.display_oracle_feed(limit=args.limit)
+            elif args.action == "configuration":
+                reader.display_network_configuration()
+            elif args.action == "all-configurations":
+                reader.display_all_network_configurations()
+    finally:
+        if results_client is not None:
+            results_client.close()
+        chain_context.close()
 
 
 def main():
     """main execution program"""
+    if sys.argv[1:2] == ["node"]:
+        node_args = create_node_parser().parse_args(sys.argv[2:])
+        try:
+            display_node(NodeIndex.load(node_args.index_file), node_args.pkh)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+        return
+
     parser = create_parser()
     args = parser.parse_args(None if sys.argv[1:] else ["-h"])
+    if args.token_pair in ("preprod", "mainnet"):
+        # A lone environment (`--action crossrates mainnet`) lands in token_pair.
+        args.environment, args.token_pair = args.token_pair, "ADA-USD"
     try:
         display(args)
     except (ConnectionError, ValueError) as exc:
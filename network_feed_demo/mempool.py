@@ -0,0 +1,249 @@
+"""Early detection of pending feed updates through Ogmios mempool monitoring.
+
+Aggregation transactions are visible in the node's mempool a block before
+any indexer reports them. The monitor scans every new mempool transaction
+for outputs carrying a pair's C3AS or OracleFeed NFT, decodes their
+`PriceData` immediately and tracks them as pending until the provider shows
+the output on chain.
+"""
+
+import threading
+import time
+
+from ogmios import Client
+from rich.console import Console
+
+from .contexts import ogmios_endpoint
+from .slots import fetch_transaction_slot
+
+console = Console()
+
+# Pending outputs that left the mempool but are not on chain after this
+# long were dropped (or spent again before the provider indexed them).
+DEFAULT_CONFIRM_TIMEOUT = 120.0
+
+
+def connect_mempool(ws_url: str):
+    """Open an Ogmios client for mempool monitoring."""
+    host, port, path, secure = ogmios_endpoint(ws_url)
+    try:
+        return Client(host=host, port=port, path=path, secure=secure)
+    except OSError as exc:
+        raise ConnectionError(
+            f"Could not connect to Ogmios at {ws_url} for mempool monitoring."
+        ) from exc
+
+
+def feed_asset(reader):
+    """(kind, policy id hex, asset name hex) of the NFT marking new feed values."""
+    kind = "C3AS" if reader.is_odv() else "OracleFeed"
+    return kind, str(reader.minting_policy), kind.encode().hex()
+
+
+class PendingFeed:
+    """Feed value produced by a mempool transaction, tracked until confirmed."""
+
+    def __init__(self, pair, kind, tx_id, index, price_data):
+        self.pair = pair
+        self.kind = kind
+        self.tx_id = tx_id
+        self.index = index
+        self.price_data = price_data
+        self.status = "pending"
+        self.seen_at = time.time()
+        self.left_mempool_at = None
+
+    @property
+    def utxo(self):
+        """Reference of the output once it is on chain."""
+        return f"{self.tx_id}#{self.index}"
+
+    def payload(self):
+        """Compact JSON-friendly view of the pending value."""
+        return {
+            "status": self.status,
+            "feed_kind": self.kind,
+            "utxo": self.utxo,
+            "price": self.price_data.get_price(),
+            "timestamp": self.price_data.get_timestamp(),
+            "expiry": self.price_data.get_expiry(),
+            "seen_at": int(self.seen_at * 1000),
+        }
+
+
+class MempoolMonitor:
+    """Watch Ogmios mempool snapshots for new feed values of the given readers.
+
+    `listener` is called with a `PendingFeed` when a value is first seen and
+    again when it becomes `confirmed` or `dropped`.
+    """
+
+    def __init__(
+        self,
+        client,
+        readers: dict,
+        listener=None,
+        confirm_timeout=DEFAULT_CONFIRM_TIMEOUT,
+    ):
+        self.client = client
+        self.readers = readers
+        self.listener = listener or (lambda pending: None)
+        self.confirm_timeout = confirm_timeout
+        self.watched = {}
+        for pair, reader in readers.items():
+            self.watched.setdefault(str(reader.network_address), []).append(
+                (pair, reader, *feed_asset(reader))
+            )
+        self.in_mempool = set()
+        self.pending = {}
+
+    def scan_transaction(self, tx):
+        """Decode the feed values produced by one Ogmios transaction."""
+        found = []
+        for index, output in enumerate(tx.get("outputs", [])):
+            for pair, reader, kind, policy, asset in self.watched.get(
+                output.get("address"), ()
+            ):
+                if output.get("value", {}).get(policy, {}).get(asset, 0) < 1:
+                    continue
+                datum = bytes.fromhex(output.get("datum") or "")
+                # Empty C3AS placeholders carry no price.
+                if not datum or reader.peek_feed_values(datum) is None:
+                    continue
+                try:
+                    price_data = reader.parse_feed_datum(datum).price_data
+                except Exception:
+                    reader.metrics.decode_error("GenericData")
+                    continue
+                found.append(PendingFeed(pair, kind, tx["id"], index, price_data))
+        return found
+
+    def process_snapshot(self, transactions):
+        """Handle one mempool snapshot: report new values, then settle old ones."""
+        now = time.time()
+        in_mempool = set()
+        for tx in transactions:
+            in_mempool.add(tx["id"])
+            if tx["id"] in self.in_mempool:
+                continue
+            for pending in self.scan_transaction(tx):
+                self.pending[pending.utxo] = pending
+                self.listener(pending)
+        self.in_mempool = in_mempool
+
+        for pending in self.pending.values():
+            if pending.left_mempool_at is None and pending.tx_id not in in_mempool:
+                pending.left_mempool_at = now
+        self.check_confirmations(now)
+
+    def check_confirmations(self, now=None):
+        """Confirm or drop pending values whose transaction left the mempool."""
+        now = time.time() if now is None else now
+        waiting = [
+            pending
+            for pending in self.pending.values()
+            if pending.left_mempool_at is not None
+        ]
+        unspent = {}
+        for pending in waiting:
+            if pending.pair not in unspent:
+                unspent[pending.pair] = self.unspent_refs(pending.pair)
+            if unspent[pending.pair] is None:
+                # The provider could not be read; retry on the next snapshot.
+                continue
+            if pending.utxo in unspent[pending.pair] or self.is_confirmed(pending):
+                pending.status = "confirmed"
+            elif now - pending.left_mempool_at > self.confirm_timeout:
+                pending.status = "dropped"
+            else:
+                continue
+            del self.pending[pending.utxo]
+            self.listener(pending)
+
+    def unspent_refs(self, pair):
+        """Unspent `tx_id#index` references of a pair, or None if the read failed."""
+        try:
+            return {
+                f"{utxo.input.transaction_id}#{utxo.input.index}"
+                for utxo in self.readers[pair].get_contract_utxos()
+            }
+        except Exception as exc:
+            console.print(
+                f"[yellow]Warning: could not check confirmations of {pair}: "
+                f"{type(exc).__name__}: {exc}[/yellow]"
+            )
+            return None
+
+    def is_confirmed(self, pending):
+        """Whether the provider knows the transaction, even if its output was spent."""
+        try:
+            return (
+                fetch_transaction_slot(
+                    self.readers[pending.pair].context, pending.tx_id
+                )
+                is not None
+            )
+        except Exception:
+            return False
+
+    def next_snapshot(self):
+        """Acquire the next mempool snapshot and read all of its transactions."""
+        self.client.acquire_mempool.execute()
+        transactions = []
+        while True:
+            tx, _ = self.client.next_transaction.execute()
+            if tx is None:
+                return transactions
+            transactions.append(tx)
+
+    def run(self):
+        """Process mempool snapshots until interrupted.
+
+        `acquireMempool` blocks until the mempool changes, so confirmations
+        are settled once per snapshot (at least once per block).
+        """
+        while True:
+            self.process_snapshot(self.next_snapshot())
+
+
+def start_mempool_monitor(monitor):
+    """Run a monitor on a background thread, reporting when it stops."""
+
+    def run():
+        try:
+            monitor.run()
+        except Exception as exc:
+            console.print(
+                f"[red]Mempool monitoring stopped: {type(exc).__name__}: {exc}[/red]"
+            )
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def print_pending(pending):
+    """Console line for a pending, confirmed or dropped feed value."""
+    styles = {"pending": "yellow", "confirmed": "green", "dropped": "red"}
+    price = pending.price_data.get_price() / 1000000
+    created = time.strftime(
+        "%Y-%m-%d %H:%M:%S", time.gmtime(pending.price_data.get_timestamp() / 1000)
+    )
+    console.print(
+        f"[{styles[pending.status]}]{pending.status.upper():<9}[/] "
+        f"{pending.pair:<16} ${price:.6f}  created {created}  "
+        f"[dim]{pending.tx_id[:16]}...#{pending.index}[/dim]"
+    )
+
+
+def run_mempool(client, readers: dict, ws_url: str):
+    """Print new feed values from the mempool until interrupted."""
+    console.print(
+        f"[green]Watching the mempool at {ws_url} for {len(readers)} pair(s)[/green]"
+    )
+    try:
+        MempoolMonitor(client, readers, listener=print_pending).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.connection.close()
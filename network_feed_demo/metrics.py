@@ -0,0 +1,332 @@
+"""Prometheus metrics for long-running Charli3 readers."""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_value(value):
+    """Render a sample value in the Prometheus text format."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value):
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names, label_values, extra=()):
+    """Render a label set as `{name="value",...}`."""
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ""
+    return (
+        "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+    )
+
+
+class Metric:
+    """Base class for a labelled metric family."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def label_key(self, labels):
+        """Turn keyword labels into the tuple key used for storage."""
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.label_names}, got {tuple(labels)}."
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """Yield `(suffix, label_values, extra_labels, value)` tuples."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield "", key, (), value
+
+    def render(self):
+        """Render the metric family in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for suffix, key, extra, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{format_labels(self.label_names, key, extra)} "
+                f"{format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Increment the counter for a label set."""
+        key = self.label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        """Set the gauge for a label set."""
+        key = self.label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation for a label set."""
+        key = self.label_key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        """Yield cumulative bucket, sum and count samples."""
+        with self._lock:
+            items = [
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._values.items()
+            ]
+        for key, counts, total, count in sorted(items):
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield "_bucket", key, (("le", format_value(bound)),), bucket_count
+            yield "_bucket", key, (("le", "+Inf"),), count
+            yield "_sum", key, (), total
+            yield "_count", key, (), count
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Register a metric family, returning the existing one on name clashes."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, label_names=()):
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        """Create and register a gauge."""
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self):
+        """Render every registered metric family."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+FEED_TIMESTAMP = REGISTRY.gauge(
+    "charli3_feed_timestamp_seconds",
+    "Unix time the latest valid feed value was created.",
+    ("env", "pair"),
+)
+FEED_EXPIRY = REGISTRY.gauge(
+    "charli3_feed_expiry_timestamp_seconds",
+    "Unix time the latest valid feed value expires.",
+    ("env", "pair"),
+)
+FEED_PRICE = REGISTRY.gauge(
+    "charli3_feed_price",
+    "Latest valid feed value (raw value divided by 1e6).",
+    ("env", "pair"),
+)
+C3AS_UTXOS = REGISTRY.gauge(
+    "charli3_c3as_utxos",
+    "ODV aggregate-state UTxOs by state (valid or placeholder).",
+    ("env", "pair", "state"),
+)
+UTXO_FETCH_SECONDS = REGISTRY.histogram(
+    "charli3_utxo_fetch_seconds",
+    "Latency of contract UTxO fetches.",
+    ("provider",),
+)
+DATUM_DECODE_SECONDS = REGISTRY.histogram(
+    "charli3_datum_decode_seconds",
+    "Latency of datum decoding.",
+    ("provider",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+UTXO_CACHE_REQUESTS = REGISTRY.counter(
+    "charli3_utxo_cache_requests_total",
+    "Contract UTxO cache lookups by result (hit or miss).",
+    ("provider", "result"),
+)
+DATUM_DECODE_ERRORS = REGISTRY.counter(
+    "charli3_datum_decode_errors_total",
+    "Datums that failed to decode, by datum type.",
+    ("provider", "datum"),
+)
+PROVIDER_RETRIES = REGISTRY.counter(
+    "charli3_provider_retries_total",
+    "Provider calls retried after a 429 or 5xx response, by status.",
+    ("provider", "status"),
+)
+PROVIDER_COALESCED = REGISTRY.counter(
+    "charli3_provider_coalesced_total",
+    "Provider calls answered by an identical in-flight request.",
+    ("provider",),
+)
+STREAM_SUBSCRIBERS = REGISTRY.gauge(
+    "charli3_stream_subscribers",
+    "Clients connected to the feed event stream.",
+)
+STREAM_EVENTS = REGISTRY.counter(
+    "charli3_stream_events_total",
+    "Change events published to the feed event stream, by datum kind.",
+    ("kind",),
+)
+STREAM_LAGGED = REGISTRY.counter(
+    "charli3_stream_lagged_total",
+    "Stream clients disconnected because their queue filled up.",
+)
+READ_ERRORS = REGISTRY.counter(
+    "charli3_read_errors_total",
+    "Failed polls of a feed.",
+    ("env", "pair"),
+)
+LAST_SUCCESS = REGISTRY.gauge(
+    "charli3_last_success_timestamp_seconds",
+    "Unix time of the last successful poll of a feed.",
+    ("env", "pair"),
+)
+
+
+class ReaderMetrics:
+    """Record reader timings and outcomes under a fixed set of labels."""
+
+    def __init__(self, provider, environment, pair):
+        self.provider = provider
+        self.environment = environment
+        self.pair = pair
+
+    def time_fetch(self):
+        """Time a contract UTxO fetch."""
+        return UTXO_FETCH_SECONDS.time(provider=self.provider)
+
+    def time_decode(self):
+        """Time a datum decode."""
+        return DATUM_DECODE_SECONDS.time(provider=self.provider)
+
+    def cache_lookup(self, hit):
+        """Count a UTxO cache hit or miss."""
+        UTXO_CACHE_REQUESTS.inc(provider=self.provider, result="hit" if hit else "miss")
+
+    def decode_error(self, datum_type):
+        """Count a datum that failed to decode."""
+        DATUM_DECODE_ERRORS.inc(provider=self.provider, datum=datum_type)
+
+    def observe_c3as(self, valid, placeholder):
+        """Record how many C3AS UTxOs carried a value and how many were empty."""
+        C3AS_UTXOS.set(valid, env=self.environment, pair=self.pair, state="valid")
+        C3AS_UTXOS.set(
+            placeholder, env=self.environment, pair=self.pair, state="placeholder"
+        )
+
+    def observe_feed(self, price_data):
+        """Record price, creation and expiry time of the latest feed value.
+
+        Times are absolute, so ages computed at query time (`time() - ...`)
+        keep growing while polls fail.
+        """
+        labels = {"env": self.environment, "pair": self.pair}
+        FEED_PRICE.set(price_data.get_price() / 1000000, **labels)
+        FEED_TIMESTAMP.set(price_data.get_timestamp() / 1000, **labels)
+        FEED_EXPIRY.set(price_data.get_expiry() / 1000, **labels)
+
+    def poll_succeeded(self):
+        """Mark a successful poll of this feed."""
+        LAST_SUCCESS.set(time.time(), env=self.environment, pair=self.pair)
+
+    def poll_failed(self):
+        """Count a failed poll of this feed."""
+        READ_ERRORS.inc(env=self.environment, pair=self.pair)
+
+
+class NoopReaderMetrics:
+    """Stand-in used when a reader runs without metrics."""
+
+    @contextmanager
+    def time_fetch(self):
+        """Do nothing."""
+        yield
+
+    @contextmanager
+    def time_decode(self):
+        """Do nothing."""
+        yield
+
+    def cache_lookup(self, hit):
+        """Do nothing."""
+
+    def decode_error(self, datum_type):
+        """Do nothing."""
+
+    def observe_c3as(self, valid, placeholder):
+        """Do nothing."""
+
+    def poll_succeeded(self):
+        """Do nothing."""
+
+    def poll_failed(self):
+        """Do nothing."""
@@ -0,0 +1,273 @@
+"""Inverted index from node PKH to the feeds it serves and the rewards it earned."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+console = Console()
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "charli3",
+    "node-index.json",
+)
+
+
+def tracked_nfts(reader):
+    """NFTs whose datums feed the index for the reader's contract family."""
+    if reader.is_odv():
+        return (reader.odv_core_settings_nft, reader.odv_reward_accounts_nft)
+    return (reader.aggregate_state_nft,)
+
+
+def datum_fingerprint(reader):
+    """Hash of the tracked UTxO references and datums of a contract.
+
+    Confirmed datums never change in place, so an unchanged fingerprint
+    means the decoded index entries are still valid.
+    """
+    digest = hashlib.sha256()
+    rows = []
+    nfts = tracked_nfts(reader)
+    for utxo in reader.get_contract_utxos():
+        if not any(reader.utxo_has_asset(utxo, nft) for nft in nfts):
+            continue
+        datum = getattr(utxo.output, "datum", None)
+        rows.append(
+            (
+                str(utxo.input.transaction_id),
+                utxo.input.index,
+                (getattr(datum, "cbor", None) or b"").hex(),
+            )
+        )
+    for row in sorted(rows):
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+def index_source(reader):
+    """Decode one contract into `{pkh: {"authorized": bool, "rewards": [...]}}`."""
+    entries = {}
+
+    def entry(pkh):
+        return entries.setdefault(
+            reader.format_key_hash(pkh), {"authorized": False, "rewards": []}
+        )
+
+    if reader.is_odv():
+        settings, _ = reader.get_odv_core_settings()
+        for pkh in settings.nodes:
+            entry(pkh)["authorized"] = True
+        for (
+            created_at,
+            reward_accounts,
+            utxo,
+        ) in reader.get_odv_reward_account_entries():
+            for pkh, reward in reward_accounts.account_rewards.items():
+                entry(pkh)["rewards"].append(
+                    {
+                        "created_at": created_at,
+                        "reward": reward,
+                        "utxo": f"{utxo.input.transaction_id}#{utxo.input.index}",
+                    }
+                )
+    else:
+        for pkh in reader.get_network_configuration().os_node_list:
+            entry(pkh)["authorized"] = True
+
+    return entries
+
+
+class NodeIndex:
+    """Persistent node PKH index across environments and pairs.
+
+    `sources` keeps the decoded entries of every `env/pair` with the
+    fingerprint they were built from; `nodes` is the inverted view used for
+    O(1) lookups and is rebuilt from `sources` after each refresh.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.sources = {}
+        self.nodes = {}
+        self.updated_at = None
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """Load an index from disk, or start an empty one."""
+        index = cls(path)
+        try:
+            with open(path, "r", encoding="UTF-8") as index_file:
+                data = json.load(index_file)
+        except FileNotFoundError:
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.sources = data["sources"]
+        index.nodes = data["nodes"]
+        index.updated_at = data.get("updated_at")
+        return index
+
+    def save(self):
+        """Write the index atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # A unique temporary file, so concurrent writers never share one.
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="UTF-8",
+            dir=directory,
+            prefix=".node-index-",
+            suffix=".tmp",
+            delete=False,
+        ) as index_file:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "updated_at": self.updated_at,
+                    "sources": self.sources,
+                    "nodes": self.nodes,
+                },
+                index_file,
+            )
+        try:
+            os.replace(index_file.name, self.path)
+        except OSError:
+            os.unlink(index_file.name)
+            raise
+
+    def refresh_source(self, environment, pair, category, reader):
+        """Re-index one pair if its datums changed. Returns True when re-decoded."""
+        key = f"{environment}/{pair}"
+        fingerprint = datum_fingerprint(reader)
+        source = self.sources.get(key)
+        if source and source["fingerprint"] == fingerprint:
+            return False
+
+        self.sources[key] = {
+            "environment": environment,
+            "pair": pair,
+            "category": category,
+            "fingerprint": fingerprint,
+            "indexed_at": int(time.time()),
+            "entries": index_source(reader),
+        }
+        return True
+
+    def retain_sources(self, keys):
+        """Drop sources for pairs that are no longer configured.
+
+        Only environments that appear in `keys` are pruned; sources of other
+        environments were not indexed in this run and are kept as they are.
+        """
+        keys = set(keys)
+        environments = {key.partition("/")[0] for key in keys}
+        self.sources = {
+            key: source
+            for key, source in self.sources.items()
+            if key in keys or source["environment"] not in environments
+        }
+
+    def rebuild_nodes(self):
+        """Rebuild the PKH -> feeds view from the per-source entries."""
+        nodes = {}
+        for source in self.sources.values():
+            for pkh, entry in source["entries"].items():
+                nodes.setdefault(pkh, []).append(
+                    {
+                        "environment": source["environment"],
+                        "pair": source["pair"],
+                        "category": source["category"],
+                        "authorized": entry["authorized"],
+                        "rewards": entry["rewards"],
+                    }
+                )
+        self.nodes = nodes
+        self.updated_at = int(time.time())
+
+    def lookup(self, pkh):
+        """Feeds a node PKH appears on."""
+        return self.nodes.get(pkh.lower(), [])
+
+
+def build_index(index, readers):
+    """Refresh `index` from `{(env, pair): (category, reader)}` and save it."""
+    refreshed, unchanged, failed = [], [], []
+    for (environment, pair), (category, reader) in readers.items():
+        try:
+            if index.refresh_source(environment, pair, category, reader):
+                refreshed.append(f"{environment}/{pair}")
+            else:
+                unchanged.append(f"{environment}/{pair}")
+        except Exception as exc:
+            failed.append(f"{environment}/{pair}")
+            console.print(
+                f"[yellow]Warning: could not index {environment}/{pair}: "
+                f"{type(exc).__name__}: {exc}[/yellow]"
+            )
+
+    index.retain_sources([f"{environment}/{pair}" for environment, pair in readers])
+    index.rebuild_nodes()
+    index.save()
+
+    summary = Table(title="🗂️  CHARLI3 - Node Index", show_header=False)
+    summary.add_row("Index File:", Text(index.path, style="cyan"))
+    summary.add_row("Re-indexed Pairs:", Text(str(len(refreshed)), style="green"))
+    summary.add_row("Unchanged Pairs:", Text(str(len(unchanged)), style="yellow"))
+    summary.add_row("Failed Pairs:", Text(str(len(failed)), style="red"))
+    summary.add_row("Indexed Nodes:", Text(str(len(index.nodes)), style="magenta"))
+    console.print(Panel(summary, border_style="cyan", padding=(1, 2)))
+
+
+def display_node(index, pkh):
+    """Display every feed a node PKH appears on with its reward history."""
+    feeds = index.lookup(pkh)
+    if not feeds:
+        raise ValueError(f"Node {pkh} is not in the index at {index.path}.")
+
+    feeds_table = Table(title=f"🛰️  Node {pkh}", show_header=True)
+    feeds_table.add_column("Environment", style="cyan")
+    feeds_table.add_column("Pair", style="bold cyan")
+    feeds_table.add_column("Authorized", style="green")
+    feeds_table.add_column("Snapshots", style="magenta")
+    feeds_table.add_column("Latest Reward", style="bold green")
+
+    for feed in sorted(feeds, key=lambda item: (item["environment"], item["pair"])):
+        rewards = sorted(feed["rewards"], key=lambda item: item["created_at"])
+        feeds_table.add_row(
+            feed["environment"],
+            feed["pair"],
+            "yes" if feed["authorized"] else "no",
+            str(len(rewards)),
+            str(rewards[-1]["reward"]) if rewards else "-",
+        )
+
+    console.print(Panel(feeds_table, border_style="blue", padding=(1, 2)))
+
+    for feed in feeds:
+        if not feed["rewards"]:
+            continue
+        rewards_table = Table(
+            title=f"Rewards - {feed['environment']}/{feed['pair']}", show_header=True
+        )
+        rewards_table.add_column("Snapshot Time", style="green")
+        rewards_table.add_column("Reward", style="bold green")
+        rewards_table.add_column("UTxO", style="yellow")
+        for reward in sorted(feed["rewards"], key=lambda item: item["created_at"]):
+            tx_id, _, output_index = reward["utxo"].partition("#")
+            rewards_table.add_row(
+                time.strftime(
+                    "%Y-%m-%d %H:%M:%S", time.gmtime(reward["created_at"] / 1000)
+                ),
+                str(reward["reward"]),
+                f"{tx_id[:16]}...#{output_index}",
+            )
+        console.print(Panel(rewards_table, border_style="magenta", padding=(1, 2)))
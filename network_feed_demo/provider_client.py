@@ -0,0 +1,219 @@
+"""Rate-limit-aware access to chain providers.
+
+Wraps a chain context with a per-provider token bucket, jittered
+exponential backoff on 429/5xx responses, and single-flight coalescing so
+concurrent identical UTxO queries share one upstream request.
+"""
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from .contexts import BLOCKFROST_PAGE_SIZE, utxo_page
+from .metrics import PROVIDER_COALESCED, PROVIDER_RETRIES
+from .slots import fetch_transaction_slot
+
+# Blockfrost's documented quota: 10 requests/s with a burst of 500.
+DEFAULT_RATE_LIMITS = {
+    "blockfrost": {"rate": 10, "burst": 500},
+}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    `try_acquire` never blocks; `acquire` waits for a token. `charge` debits
+    tokens after the fact (e.g. for extra pages), letting the balance go
+    negative so later callers wait it off.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take one token if available."""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def charge(self, tokens: float):
+        """Debit extra tokens without waiting."""
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+
+
+class SingleFlight:
+    """Share the result of an in-flight call with concurrent callers of the same key."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run `fn` unless a call for `key` is already running; return (result, shared)."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
+
+
+def response_status(exc):
+    """HTTP status carried by a Blockfrost `ApiError` or a `requests` error."""
+    status = getattr(exc, "status_code", None)
+    if status is None and getattr(exc, "response", None) is not None:
+        status = getattr(exc.response, "status_code", None)
+    return status
+
+
+def retry_after(exc):
+    """Seconds requested by a `Retry-After` header, if the error carries one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedContext:
+    """Chain context wrapper that keeps a provider within its request quota.
+
+    Everything except `utxos`, `utxo_page`, `transaction_slot` and `request`
+    is delegated to the wrapped context unchanged.
+    """
+
+    def __init__(
+        self,
+        context,
+        provider: str,
+        rate: float = None,
+        burst: int = None,
+        retries: int = 5,
+        backoff_base: float = 0.25,
+        backoff_max: float = 8.0,
+    ):
+        self.context = context
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst or max(1, int(rate))) if rate else None
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.single_flight = SingleFlight()
+
+    def __getattr__(self, name):
+        return getattr(self.context, name)
+
+    def backoff(self, attempt, exc):
+        """Full-jitter exponential backoff, honouring `Retry-After` when present."""
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+        return max(delay, retry_after(exc) or 0)
+
+    def call(self, fn):
+        """Run one upstream call under the token bucket, retrying 429/5xx."""
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                return fn()
+            except Exception as exc:
+                status = response_status(exc)
+                if status not in RETRYABLE_STATUSES or attempt >= self.retries:
+                    raise
+                PROVIDER_RETRIES.inc(provider=self.provider, status=str(status))
+                time.sleep(self.backoff(attempt, exc))
+                attempt += 1
+
+    def request(self, key, fn):
+        """Rate-limited, retried call; concurrent calls with the same key share one."""
+        result, shared = self.single_flight.do(key, lambda: self.call(fn))
+        if shared:
+            PROVIDER_COALESCED.inc(provider=self.provider)
+        return result
+
+    def fetch_utxos(self, address):
+        """Fetch UTxOs, charging Blockfrost's extra result pages to the bucket."""
+        utxos = self.context.utxos(address)
+        if self.bucket is not None and hasattr(self.context, "api"):
+            pages = max(1, math.ceil(len(utxos) / BLOCKFROST_PAGE_SIZE))
+            self.bucket.charge(pages - 1)
+        return utxos
+
+    def utxos(self, address):
+        """UTxOs at an address, coalescing identical in-flight queries."""
+        address = str(address)
+        return list(self.request(("utxos", address), lambda: self.fetch_utxos(address)))
+
+    def utxo_page(self, address, page, policy_ids=None):
+        """One page of UTxOs (see `contexts.utxo_page`), one token per page."""
+        address = str(address)
+        policies = None if policy_ids is None else frozenset(policy_ids)
+        key = ("page", address, page, policies)
+        return self.request(
+            key, lambda: utxo_page(self.context, address, page, policy_ids)
+        )
+
+    def transaction_slot(self, tx_id: str):
+        """Block slot of a transaction, through the same quota."""
+        return self.request(
+            ("slot", tx_id), lambda: fetch_transaction_slot(self.context, tx_id)
+        )
+
+
+def rate_limited(context, provider: str, settings=None):
+    """Wrap `context` using `settings` merged over the provider's defaults.
+
+    `settings` is the optional `rate_limit` mapping of the provider's
+    section in config.yaml (`rate`, `burst`, `retries`).
+    """
+    options = {**DEFAULT_RATE_LIMITS.get(provider, {}), **(settings or {})}
+    return RateLimitedContext(
+        context,
+        provider,
+        rate=options.get("rate"),
+        burst=options.get("burst"),
+        retries=options.get("retries", 5),
+    )
@@ -0,0 +1,300 @@
+"""Cross-process cache of decoded reader results over a Unix socket.
+
+`charli3 --action cache-broker` computes feed, settings and reward results
+for (environment, pair) on behalf of every local CLI process. Concurrent
+requests for the same result share one computation, and results are reused
+while they are fresh, so upstream load does not grow with the number of
+local consumers. Requests and responses are single JSON lines; clients fall
+back to computing a result themselves when no broker is listening, or when
+the broker reads another service or does not serve the environment.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+from rich.console import Console
+
+from .provider_client import SingleFlight
+
+console = Console()
+
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "charli3",
+    "results.sock",
+)
+DEFAULT_RESULT_TTL = 10.0
+MAX_LINE_BYTES = 64 * 1024
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = 120.0
+
+# Reader method computing each result kind.
+RESULT_KINDS = {
+    "feed": "feed_result",
+    "settings": "settings_result",
+    "rewards": "rewards_result",
+}
+# Errors re-raised with their own type on the client; others become RuntimeError.
+# `UnsupportedRequest` makes the client compute the result itself.
+ERROR_TYPES = {"ValueError": ValueError, "ConnectionError": ConnectionError}
+
+
+class UnsupportedRequest(ValueError):
+    """A request the broker does not serve; the client reads directly instead."""
+
+
+def result_key(environment, pair, kind, params):
+    """Cache key of one result."""
+    return (environment, pair, kind, json.dumps(params, sort_keys=True))
+
+
+class ResultBroker:
+    """Fresh-result cache in front of readers built on demand.
+
+    `reader_factory(environment, pair)` builds the reader of a pair the first
+    time it is requested. Requests for another `service`, or for an
+    environment outside `environments`, are refused as `UnsupportedRequest`.
+    """
+
+    def __init__(
+        self,
+        reader_factory,
+        ttl=DEFAULT_RESULT_TTL,
+        service=None,
+        environments=None,
+    ):
+        self.reader_factory = reader_factory
+        self.ttl = ttl
+        self.service = service
+        self.environments = environments
+        self.readers = {}
+        self.results = {}
+        self.single_flight = SingleFlight()
+        self.computed = 0
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def reader(self, environment, pair):
+        """Reader of a pair, built once."""
+        with self._lock:
+            if (environment, pair) not in self.readers:
+                self.readers[(environment, pair)] = self.reader_factory(
+                    environment, pair
+                )
+            return self.readers[(environment, pair)]
+
+    def compute(self, key, environment, pair, kind, params):
+        """Compute one result and store it with its completion time."""
+        reader = self.reader(environment, pair)
+        result = getattr(reader, RESULT_KINDS[kind])(**params)
+        with self._lock:
+            self.results[key] = (time.monotonic(), result)
+            self.computed += 1
+        return result
+
+    def get(self, environment, pair, kind, params, service=None):
+        """Return `(result, age_seconds)`, computing it when missing or stale."""
+        if kind not in RESULT_KINDS:
+            raise ValueError(f"Unknown result kind {kind}.")
+        if service is not None and self.service is not None and service != self.service:
+            raise UnsupportedRequest(f"The broker reads {self.service}, not {service}.")
+        if self.environments is not None and environment not in self.environments:
+            raise UnsupportedRequest(f"The broker does not serve {environment}.")
+        key = result_key(environment, pair, kind, params)
+        with self._lock:
+            self.served += 1
+            entry = self.results.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1], time.monotonic() - entry[0]
+        result, _ = self.single_flight.do(
+            key, lambda: self.compute(key, environment, pair, kind, params)
+        )
+        return result, 0.0
+
+
+class ResultRequestHandler(socketserver.StreamRequestHandler):
+    """Answer newline-delimited JSON requests on one client connection."""
+
+    def handle(self):
+        broker = self.server.broker
+        while True:
+            line = self.rfile.readline(MAX_LINE_BYTES)
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+                result, age = broker.get(
+                    request["env"],
+                    request["pair"],
+                    request["kind"],
+                    request.get("params") or {},
+                    request.get("service"),
+                )
+                response = {"result": result, "age": round(age, 3)}
+            except Exception as exc:
+                response = {"error": {"type": type(exc).__name__, "message": str(exc)}}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class ResultBrokerServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix-socket server holding a `ResultBroker`."""
+
+    daemon_threads = True
+
+
+def socket_in_use(path):
+    """Whether a broker is already accepting connections on `path`."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(CONNECT_TIMEOUT)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def start_result_broker(broker, path=DEFAULT_SOCKET_PATH):
+    """Bind the broker socket (owner-only) and serve it on a background thread.
+
+    A socket left behind by a broker that is no longer running is replaced.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise ValueError(f"{path} exists and is not a socket.")
+        if socket_in_use(path):
+            raise ValueError(f"A result broker is already listening on {path}.")
+        os.unlink(path)
+
+    # Results are only shared with processes of the same user.
+    previous_umask = os.umask(0o177)
+    try:
+        server = ResultBrokerServer(path, ResultRequestHandler)
+    finally:
+        os.umask(previous_umask)
+    os.chmod(path, 0o600)
+    server.broker = broker
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_result_broker(broker, path=DEFAULT_SOCKET_PATH):
+    """Serve results until interrupted, then remove the socket."""
+    server = start_result_broker(broker, path)
+    console.print(
+        f"[green]Serving cached results on {path} "
+        f"(fresh for {broker.ttl:g}s)[/green]"
+    )
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        console.print(
+            f"[dim]Served {broker.served} request(s) with "
+            f"{broker.computed} computation(s)[/dim]"
+        )
+
+
+class ResultClient:
+    """Ask a local result broker for results, computing locally without one.
+
+    The connection is opened on first use and kept for later requests. Once
+    the broker is found unreachable, this client stops trying. Requests carry
+    the client's `service`, so a broker reading another service is not used.
+    """
+
+    def __init__(
+        self, path=DEFAULT_SOCKET_PATH, timeout=RESPONSE_TIMEOUT, service=None
+    ):
+        self.path = path
+        self.timeout = timeout
+        self.service = service
+        self.available = True
+        self._socket = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open the broker connection."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(self.path)
+            sock.settimeout(self.timeout)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._file = sock.makefile("rwb")
+
+    def request(self, environment, pair, kind, params):
+        """Send one request and return the decoded response line."""
+        with self._lock:
+            if self._socket is None:
+                self.connect()
+            line = json.dumps(
+                {
+                    "env": environment,
+                    "pair": pair,
+                    "kind": kind,
+                    "params": params,
+                    "service": self.service,
+                }
+            )
+            self._file.write(line.encode() + b"\n")
+            self._file.flush()
+            response = self._file.readline(MAX_LINE_BYTES * 1024)
+        if not response:
+            raise ConnectionResetError("The result broker closed the connection.")
+        return json.loads(response)
+
+    def get(self, environment, pair, kind, params, compute):
+        """Result from the broker, or `compute()` when no broker answers."""
+        if not self.available:
+            return compute()
+        try:
+            response = self.request(environment, pair, kind, params)
+        except (OSError, ValueError):
+            self.available = False
+            self.close()
+            return compute()
+
+        if "error" in response:
+            error = response["error"]
+            if error["type"] == UnsupportedRequest.__name__:
+                return compute()
+            error_type = ERROR_TYPES.get(error["type"])
+            if error_type is None:
+                raise RuntimeError(f"{error['type']}: {error['message']}")
+            raise error_type(error["message"])
+        return response["result"]
+
+    def bind(self, environment, pair):
+        """`results` callable for the reader of one pair."""
+        return lambda kind, params, compute: self.get(
+            environment, pair, kind, params, compute
+        )
+
+    def close(self):
+        """Close the broker connection, if open."""
+        with self._lock:
+            if self._socket is not None:
+                self._file.close()
+                self._socket.close()
+                self._socket = None
+                self._file = None
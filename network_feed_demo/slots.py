@@ -0,0 +1,96 @@
+"""Resolve transaction ids to block slots, with a permanent local cache."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_SLOT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "charli3",
+    "tx-slots.json",
+)
+
+
+def fetch_transaction_slot(chain_context, tx_id: str):
+    """Ask a provider for the slot of one transaction (None if unsupported)."""
+    if hasattr(chain_context, "transaction_slot"):
+        return chain_context.transaction_slot(tx_id)
+
+    api = getattr(chain_context, "api", None)
+    if api is not None:
+        return api.transaction(tx_id).slot
+
+    return None
+
+
+class SlotResolver:
+    """Look up the slot of the block that included each transaction.
+
+    Confirmed transactions never move, so resolved slots are cached on disk
+    forever; only unknown ids are fetched, concurrently, from the provider.
+    """
+
+    def __init__(
+        self, chain_context, cache_path=DEFAULT_SLOT_CACHE_PATH, max_workers=8
+    ):
+        self.context = chain_context
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self._cache = None
+
+    def load_cache(self):
+        """Read the on-disk slot cache."""
+        try:
+            with open(self.cache_path, "r", encoding="UTF-8") as cache_file:
+                return json.load(cache_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_cache(self):
+        """Merge with the on-disk cache (other processes may have added ids) and save."""
+        merged = self.load_cache()
+        merged.update(self._cache)
+        self._cache = merged
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as cache_file:
+            json.dump(merged, cache_file)
+        os.replace(tmp_path, self.cache_path)
+
+    def fetch_slot(self, tx_id: str):
+        """Ask the provider for the slot of one transaction (None if unknown)."""
+        return fetch_transaction_slot(self.context, tx_id)
+
+    def safe_fetch_slot(self, tx_id: str):
+        """`fetch_slot`, reporting failures as unresolved instead of raising."""
+        try:
+            return self.fetch_slot(tx_id)
+        except Exception as exc:
+            console.print(
+                f"[yellow]Warning: could not resolve slot of {tx_id[:16]}...: "
+                f"{type(exc).__name__}: {exc}[/yellow]"
+            )
+            return None
+
+    def resolve(self, tx_ids):
+        """Map every transaction id to its slot (None when it cannot be resolved)."""
+        if self._cache is None:
+            self._cache = self.load_cache()
+
+        tx_ids = [str(tx_id) for tx_id in tx_ids]
+        missing = sorted({tx_id for tx_id in tx_ids if tx_id not in self._cache})
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                slots = dict(zip(missing, pool.map(self.safe_fetch_slot, missing)))
+            resolved = {
+                tx_id: slot for tx_id, slot in slots.items() if slot is not None
+            }
+            if resolved:
+                self._cache.update(resolved)
+                self.save_cache()
+
+        return {tx_id: self._cache.get(tx_id) for tx_id in tx_ids}
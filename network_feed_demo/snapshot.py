@@ -0,0 +1,196 @@
+"""Capture contract UTxO sets to a snapshot file and replay them offline."""
+
+import mmap
+import struct
+import time
+from functools import lru_cache
+
+import cbor2
+from pycardano import (
+    Address,
+    AssetName,
+    MultiAsset,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+from pycardano.hash import DatumHash
+from pycardano.serialization import RawCBOR
+
+from .slots import SlotResolver
+
+MAGIC = b"C3SNAP01"
+HEADER_LENGTH = struct.Struct(">I")
+SNAPSHOT_VERSION = 1
+AGGREGATE_STATE_ASSET = AssetName(b"AggState")
+
+
+def encode_utxo(utxo):
+    """Encode the parts of a UTxO the reader uses as a compact CBOR array.
+
+    Reference scripts are not kept: none of the Charli3 reads depend on them.
+    """
+    output = utxo.output
+    datum = getattr(output, "datum", None)
+    multi_asset = output.amount.multi_asset
+    return [
+        utxo.input.transaction_id.payload,
+        utxo.input.index,
+        bytes(output.address),
+        output.amount.coin,
+        multi_asset.to_primitive() if multi_asset else None,
+        getattr(datum, "cbor", None) if datum else None,
+        output.datum_hash.payload if output.datum_hash else None,
+    ]
+
+
+def decode_utxo(item):
+    """Rebuild a pycardano UTxO from `encode_utxo` output."""
+    tx_id, index, address, coin, multi_asset, datum, datum_hash = item
+    amount = Value(
+        coin, MultiAsset.from_primitive(multi_asset) if multi_asset else MultiAsset()
+    )
+    output = TransactionOutput(
+        Address.from_primitive(address),
+        amount,
+        datum_hash=DatumHash(datum_hash) if datum_hash else None,
+        datum=RawCBOR(datum) if datum else None,
+    )
+    return UTxO(TransactionInput.from_primitive([tx_id, index]), output)
+
+
+def query_tip_slot(chain_context):
+    """Best-effort tip slot of a live context, recorded as snapshot metadata."""
+    try:
+        return chain_context.last_block_slot
+    except Exception:
+        return None
+
+
+def aggregate_state_tx_ids(utxos):
+    """Transactions that produced a legacy `AggState` output."""
+    return {
+        str(utxo.input.transaction_id)
+        for utxo in utxos
+        if any(
+            AGGREGATE_STATE_ASSET in assets
+            for assets in (utxo.output.amount.multi_asset or {}).values()
+        )
+    }
+
+
+def write_snapshot(
+    path, chain_context, pairs, environment, service, slot_resolver=None
+):
+    """Write the UTxO sets of `pairs` (pair -> address) to `path`.
+
+    Pairs that share a contract address are fetched and stored once. The
+    block slots of `AggState`-producing transactions are stored as well, so
+    replays can order legacy configurations without network access.
+    """
+    addresses = sorted(set(pairs.values()))
+    blobs = []
+    index = {}
+    offset = 0
+    tx_ids = set()
+    for address in addresses:
+        utxos = chain_context.utxos(address)
+        blob = cbor2.dumps([encode_utxo(utxo) for utxo in utxos])
+        index[address] = [offset, len(blob), len(utxos)]
+        blobs.append(blob)
+        offset += len(blob)
+        tx_ids |= aggregate_state_tx_ids(utxos)
+
+    slot_resolver = slot_resolver or SlotResolver(chain_context)
+    slots = slot_resolver.resolve(sorted(tx_ids)) if tx_ids else {}
+
+    header = cbor2.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "environment": environment,
+            "service": service,
+            "created_at": int(time.time() * 1000),
+            "tip": {"slot": query_tip_slot(chain_context)},
+            "pairs": dict(pairs),
+            "slots": {tx_id: slot for tx_id, slot in slots.items() if slot is not None},
+            "addresses": index,
+        }
+    )
+
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC)
+        snapshot_file.write(HEADER_LENGTH.pack(len(header)))
+        snapshot_file.write(header)
+        for blob in blobs:
+            snapshot_file.write(blob)
+
+    return {address: entry[2] for address, entry in index.items()}
+
+
+class SnapshotChainContext:
+    """Read-only chain context serving UTxOs from a memory-mapped snapshot.
+
+    Only the header is parsed up front; each address is decoded on first
+    use and kept for later reads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a Charli3 UTxO snapshot.")
+
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack(self._mmap[len(MAGIC) : header_start])
+        self.header = cbor2.loads(
+            self._mmap[header_start : header_start + header_length]
+        )
+        if self.header.get("version") != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"Unsupported snapshot version {self.header.get('version')} in {path}."
+            )
+        self._body_start = header_start + header_length
+        self._decode_address = lru_cache(maxsize=None)(self._decode_address_uncached)
+
+    @property
+    def environment(self):
+        """Environment the snapshot was captured from."""
+        return self.header["environment"]
+
+    @property
+    def pairs(self):
+        """Token pairs captured in the snapshot, mapped to their addresses."""
+        return self.header["pairs"]
+
+    @property
+    def last_block_slot(self):
+        """Tip slot at capture time, when the provider reported one."""
+        return self.header["tip"]["slot"]
+
+    def transaction_slot(self, tx_id):
+        """Block slot of a transaction recorded at capture time, if any."""
+        return self.header.get("slots", {}).get(str(tx_id))
+
+    def _decode_address_uncached(self, address):
+        entry = self.header["addresses"].get(address)
+        if entry is None:
+            return ()
+        offset, length, _ = entry
+        start = self._body_start + offset
+        return tuple(
+            decode_utxo(item)
+            for item in cbor2.loads(self._mmap[start : start + length])
+        )
+
+    def utxos(self, address):
+        """Return the captured UTxOs of an address (empty when not captured)."""
+        return list(self._decode_address(str(address)))
+
+    def close(self):
+        """Release the memory map."""
+        self._mmap.close()
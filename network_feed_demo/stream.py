@@ -0,0 +1,381 @@
+"""Push feed changes to many subscribers over Server-Sent Events.
+
+One `FeedWatcher` polls the configured pairs and publishes a compact event
+whenever a watched datum (C3AS / OracleFeed value, C3CS settings, C3RA
+snapshot) changes. The `EventBroker` fans each event out to every
+subscriber, so upstream load does not depend on the number of consumers.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rich.console import Console
+
+from .exporter import MetricsHandler
+from .metrics import STREAM_EVENTS, STREAM_LAGGED, STREAM_SUBSCRIBERS
+
+console = Console()
+
+DEFAULT_HISTORY = 1024
+DEFAULT_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+
+
+class Event:
+    """One published change, with its SSE frame encoded once for all subscribers."""
+
+    def __init__(self, event_id, environment, pair, kind, payload):
+        self.id = event_id
+        self.environment = environment
+        self.pair = pair
+        self.kind = kind
+        self.payload = payload
+        data = json.dumps(
+            {"id": event_id, "env": environment, "pair": pair, "kind": kind, **payload},
+            separators=(",", ":"),
+        )
+        self.frame = f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+
+class Subscriber:
+    """Bounded event queue of one client.
+
+    A client whose queue fills up is marked as lagged: it receives what is
+    already queued and is then disconnected, to resume from the history with
+    `Last-Event-ID` instead of slowing down the other subscribers.
+    """
+
+    def __init__(self, max_queue, pairs=None, kinds=None):
+        self.max_queue = max_queue
+        self.pairs = set(pairs) if pairs else None
+        self.kinds = set(kinds) if kinds else None
+        self.events = deque()
+        self.lagged = False
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def wants(self, event):
+        """Whether the event matches the client's pair and kind filters."""
+        return (self.pairs is None or event.pair in self.pairs) and (
+            self.kinds is None or event.kind in self.kinds
+        )
+
+    def preload(self, events):
+        """Queue the resume backlog, which is not subject to the queue bound."""
+        with self._cond:
+            self.events.extend(event for event in events if self.wants(event))
+
+    def offer(self, event):
+        """Queue a live event. Returns False once the client is lagging."""
+        with self._cond:
+            if len(self.events) >= self.max_queue:
+                self.lagged = True
+                self._cond.notify()
+                return False
+            self.events.append(event)
+            self._cond.notify()
+            return True
+
+    def close(self):
+        """Stop the client after its queued events."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    @property
+    def done(self):
+        """Whether the client should be disconnected once its queue is drained."""
+        return self.lagged or self.closed
+
+    def next_event(self, timeout):
+        """Next queued event, or None on timeout or once the client is done."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.events or self.done, timeout)
+            return self.events.popleft() if self.events else None
+
+
+class EventBroker:
+    """Sequence events, keep a replay history and fan out to subscribers."""
+
+    def __init__(self, history=DEFAULT_HISTORY, queue_size=DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.history = deque(maxlen=history)
+        self.latest = {}
+        self.last_id = 0
+        self.subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, environment, pair, kind, payload):
+        """Publish a change and deliver it to every interested subscriber."""
+        with self._lock:
+            self.last_id += 1
+            event = Event(self.last_id, environment, pair, kind, payload)
+            self.history.append(event)
+            self.latest[(environment, pair, kind)] = event
+            lagging = [
+                subscriber
+                for subscriber in self.subscribers
+                if subscriber.wants(event) and not subscriber.offer(event)
+            ]
+            self.subscribers.difference_update(lagging)
+            STREAM_SUBSCRIBERS.set(len(self.subscribers))
+        STREAM_EVENTS.inc(kind=kind)
+        if lagging:
+            STREAM_LAGGED.inc(len(lagging))
+        return event
+
+    def backlog(self, last_event_id):
+        """Events a client must receive before live ones (call under the lock).
+
+        New clients, and clients whose `last_event_id` fell out of the
+        history, get the latest event of every datum newer than what they
+        saw; others get exactly the events they missed.
+        """
+        first_id = self.history[0].id if self.history else self.last_id + 1
+        if last_event_id is not None and first_id - 1 <= last_event_id <= self.last_id:
+            return [event for event in self.history if event.id > last_event_id]
+
+        # Unknown ids (e.g. from before a restart) get the full current state.
+        if last_event_id is None or last_event_id > self.last_id:
+            last_event_id = 0
+        return sorted(
+            (event for event in self.latest.values() if event.id > last_event_id),
+            key=lambda event: event.id,
+        )
+
+    def subscribe(self, last_event_id=None, pairs=None, kinds=None):
+        """Register a client, queueing its backlog atomically with registration."""
+        subscriber = Subscriber(self.queue_size, pairs, kinds)
+        with self._lock:
+            subscriber.preload(self.backlog(last_event_id))
+            self.subscribers.add(subscriber)
+            STREAM_SUBSCRIBERS.set(len(self.subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Forget a disconnected client."""
+        with self._lock:
+            self.subscribers.discard(subscriber)
+            STREAM_SUBSCRIBERS.set(len(self.subscribers))
+
+    def close(self):
+        """Disconnect every client."""
+        with self._lock:
+            subscribers, self.subscribers = self.subscribers, set()
+            STREAM_SUBSCRIBERS.set(0)
+        for subscriber in subscribers:
+            subscriber.close()
+
+
+def utxo_ref(utxo):
+    """Render a UTxO reference as `tx_id#index`."""
+    return f"{utxo.input.transaction_id}#{utxo.input.index}"
+
+
+def watched_kinds(reader):
+    """NFT identifying each watched datum kind of the reader's contract family."""
+    if reader.is_odv():
+        return {
+            "C3AS": reader.odv_aggregate_state_nft,
+            "C3CS": reader.odv_core_settings_nft,
+            "C3RA": reader.odv_reward_accounts_nft,
+        }
+    return {"OracleFeed": reader.network_feed_nft}
+
+
+def kind_fingerprints(reader, kinds):
+    """Hash the references and datums of the UTxOs carrying each kind's NFT."""
+    rows = {kind: [] for kind in kinds}
+    for utxo in reader.get_contract_utxos():
+        for kind, nft in kinds.items():
+            if reader.utxo_has_asset(utxo, nft):
+                datum = getattr(utxo.output, "datum", None)
+                cbor = getattr(datum, "cbor", None) or b""
+                rows[kind].append((utxo_ref(utxo), cbor.hex()))
+    return {
+        kind: hashlib.sha256(repr(sorted(kind_rows)).encode()).hexdigest()
+        for kind, kind_rows in rows.items()
+    }
+
+
+def odv_feed_payload(reader):
+    """Newest valid C3AS value, as the `feed` action reports it."""
+    try:
+        return reader.feed_result(limit=1)[-1]
+    except ValueError:
+        # No non-empty C3AS UTxO yet.
+        return None
+
+
+def legacy_feed_payload(reader):
+    """Current OracleFeed value, as the `feed` action reports it."""
+    return reader.legacy_feed_result()
+
+
+def core_settings_payload(reader):
+    """Node set, quorum, fees and timing of the C3CS datum."""
+    return reader.settings_result()
+
+
+def reward_accounts_payload(reader):
+    """Newest C3RA snapshot, summarized."""
+    entries = reader.get_odv_reward_account_entries()
+    if not entries:
+        return None
+    created_at, reward_accounts, utxo = entries[-1]
+    return {
+        "utxo": utxo_ref(utxo),
+        "created_at": created_at,
+        "accounts": len(reward_accounts.account_rewards),
+        "total_rewards": sum(reward_accounts.account_rewards.values()),
+    }
+
+
+KIND_PAYLOADS = {
+    "C3AS": odv_feed_payload,
+    "OracleFeed": legacy_feed_payload,
+    "C3CS": core_settings_payload,
+    "C3RA": reward_accounts_payload,
+}
+
+
+class FeedWatcher:
+    """Single upstream poller that publishes datum changes to a broker.
+
+    A kind is only decoded when the fingerprint of its UTxOs changed, and
+    only published when the decoded payload differs from the last one.
+    """
+
+    def __init__(self, broker, readers: dict, environment: str):
+        self.broker = broker
+        self.readers = readers
+        self.environment = environment
+        self.fingerprints = {}
+        self.payloads = {}
+
+    def poll_pair(self, pair, reader):
+        """Publish the changed datums of one pair."""
+        kinds = watched_kinds(reader)
+        for kind, fingerprint in kind_fingerprints(reader, kinds).items():
+            key = (pair, kind)
+            if self.fingerprints.get(key) == fingerprint:
+                continue
+            payload = KIND_PAYLOADS[kind](reader)
+            self.fingerprints[key] = fingerprint
+            if payload is not None and payload != self.payloads.get(key):
+                self.payloads[key] = payload
+                self.broker.publish(self.environment, pair, kind, payload)
+
+    def poll(self):
+        """Check every pair once."""
+        for pair, reader in self.readers.items():
+            try:
+                self.poll_pair(pair, reader)
+                reader.metrics.poll_succeeded()
+            except Exception as exc:
+                reader.metrics.poll_failed()
+                console.print(
+                    f"[red]Error watching {pair}: {type(exc).__name__}: {exc}[/red]"
+                )
+
+
+def query_list(query, name):
+    """Values of a repeated or comma-separated query parameter, or None."""
+    values = [
+        value for item in query.get(name, []) for value in item.split(",") if value
+    ]
+    return values or None
+
+
+class StreamHandler(MetricsHandler):
+    """Serve `/events` as Server-Sent Events, plus the metrics endpoint."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle `GET /events` and `GET /metrics`."""
+        url = urlparse(self.path)
+        if url.path != "/events":
+            super().do_GET()
+            return
+
+        query = parse_qs(url.query)
+        last_event_id = self.headers.get("Last-Event-ID") or next(
+            iter(query.get("last_event_id", [])), None
+        )
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            self.send_error(400, "Last-Event-ID must be an integer")
+            return
+
+        broker = self.server.broker
+        subscriber = broker.subscribe(
+            last_event_id,
+            pairs=query_list(query, "pair"),
+            kinds=query_list(query, "kind"),
+        )
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(b"retry: 3000\n\n")
+            self.wfile.flush()
+            while True:
+                event = subscriber.next_event(self.server.heartbeat)
+                if event is not None:
+                    self.wfile.write(event.frame)
+                elif subscriber.done:
+                    break
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            broker.unsubscribe(subscriber)
+
+
+def start_stream_server(broker, host: str, port: int, heartbeat=HEARTBEAT_SECONDS):
+    """Start the event stream endpoint on a background thread."""
+    server = ThreadingHTTPServer((host, port), StreamHandler)
+    server.daemon_threads = True
+    server.broker = broker
+    server.heartbeat = heartbeat
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_stream(
+    readers: dict,
+    environment: str,
+    host: str,
+    port: int,
+    interval: float,
+    broker=None,
+):
+    """Watch every reader each `interval` seconds and stream the changes."""
+    broker = broker if broker is not None else EventBroker()
+    watcher = FeedWatcher(broker, readers, environment)
+    server = start_stream_server(broker, host, port)
+    console.print(
+        f"[green]Streaming changes of {len(readers)} pair(s) on "
+        f"http://{host}:{port}/events every {interval:g}s[/green]"
+    )
+
+    try:
+        while True:
+            started = time.monotonic()
+            watcher.poll()
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+"""Hand-computed triangulation over three assets."""
+
+import pytest
+
+from network_feed_demo.crossrates import RateMatrix, triangulate
+
+NOW_MS = 1_000_000
+FRESH = (900_000, 2_000_000)
+
+
+def test_triangulate_three_assets():
+    # A-B is quoted directly; B-A is its slightly-off inverse; B-C is only
+    # available inverted (from C-B), and that feed has expired.
+    matrix = RateMatrix(
+        {
+            "A-B": (2_000_000, *FRESH),
+            "B-A": (490_000, *FRESH),
+            "C-B": (250_000, 900_000, 950_000),
+            "A-C": (8_000_000, *FRESH),
+        }
+    )
+    report = triangulate(matrix, now_ms=NOW_MS, tolerance=0.01)
+
+    assert matrix.assets == ["A", "B", "C"]
+    assert report.stale_pairs == ["C-B"]
+
+    implied = {(entry["pair"], entry["via"]): entry for entry in report.implied}
+    assert sorted(implied) == [
+        ("A-B", "C"),
+        ("A-C", "B"),
+        ("B-A", "C"),
+        ("C-B", "A"),
+    ]
+
+    # A-C (8) x C-B (0.25) = 2, equal to the direct A-B feed.
+    entry = implied[("A-B", "C")]
+    assert entry["legs"] == ["A-C", "C-B"]
+    assert entry["rate"] == pytest.approx(2.0)
+    assert entry["direct"] == pytest.approx(2.0)
+    assert entry["divergence"] == pytest.approx(0.0)
+    assert (entry["flagged"], entry["stale"]) == (False, True)
+
+    # A-B (2) x 1/C-B (4) = 8 through the inverted-only leg.
+    entry = implied[("A-C", "B")]
+    assert entry["legs"] == ["A-B", "1/C-B"]
+    assert entry["rate"] == pytest.approx(8.0)
+    assert entry["divergence"] == pytest.approx(0.0)
+    assert (entry["flagged"], entry["stale"]) == (False, True)
+
+    # 1/C-B (4) x 1/A-C (0.125) = 0.5 against the direct 0.49: +2.04%.
+    entry = implied[("B-A", "C")]
+    assert entry["legs"] == ["1/C-B", "1/A-C"]
+    assert entry["rate"] == pytest.approx(0.5)
+    assert entry["direct"] == pytest.approx(0.49)
+    assert entry["divergence"] == pytest.approx(0.5 / 0.49 - 1)
+    assert (entry["flagged"], entry["stale"]) == (True, True)
+
+    # 1/A-C (0.125) x A-B (2) = 0.25 avoids the expired C-B leg.
+    entry = implied[("C-B", "A")]
+    assert entry["legs"] == ["1/A-C", "A-B"]
+    assert entry["rate"] == pytest.approx(0.25)
+    assert entry["divergence"] == pytest.approx(0.0)
+    assert (entry["flagged"], entry["stale"]) == (False, False)
+    assert (entry["timestamp"], entry["expiry"]) == FRESH
+
+    # A-B x B-A = 0.98, 2% off the expected 1.
+    assert len(report.inverse) == 1
+    inverse = report.inverse[0]
+    assert (inverse["pair"], inverse["inverse"]) == ("A-B", "B-A")
+    assert inverse["product"] == pytest.approx(0.98)
+    assert inverse["divergence"] == pytest.approx(-0.02)
+    assert (inverse["flagged"], inverse["stale"]) == (True, False)
+
+    assert report.divergences == [implied[("B-A", "C")], inverse]
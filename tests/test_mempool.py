@@ -0,0 +1,134 @@
+"""Mempool monitoring against the fake Ogmios replay and fake provider."""
+
+import argparse
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from network_feed_demo.contexts import KupoChainContext
+from network_feed_demo.fake_ogmios import (
+    MempoolReplay,
+    start_fake_ogmios,
+    synthetic_mempool_snapshots,
+    transaction_spent_refs,
+    transaction_utxos,
+)
+from network_feed_demo.fake_server import (
+    FakeChainState,
+    add_fake_server_arguments,
+    build_fake_server,
+)
+from network_feed_demo.main import create_reader
+from network_feed_demo.mempool import MempoolMonitor, connect_mempool
+
+NETWORKS = Path(__file__).resolve().parents[1] / "preprod-c3-networks.yaml"
+# Transactions of this pair never reach the chain, so its values are dropped.
+DROPPED_PAIR = "BTC-USD"
+CONFIRM_TIMEOUT = 0.5
+
+
+@pytest.fixture
+def mempool():
+    args = add_fake_server_arguments(argparse.ArgumentParser()).parse_args(
+        ["--networks", str(NETWORKS)]
+    )
+    state = FakeChainState.synthetic(args.networks, args)
+    provider = build_fake_server(args, "127.0.0.1", 0, state)
+    host, port = provider.server_address[:2]
+    context = KupoChainContext(f"http://{host}:{port}")
+
+    with open(NETWORKS, encoding="UTF-8") as networks:
+        c3_networks = yaml.load(networks, Loader=yaml.FullLoader)
+    readers = {pair: create_reader(pair, c3_networks, context) for pair in c3_networks}
+
+    def on_block(transactions):
+        for tx in transactions:
+            policies = set(tx["outputs"][0]["value"]) - {"ada"}
+            if c3_networks[DROPPED_PAIR]["minting-policy"] in policies:
+                continue
+            state.apply_transaction(transaction_spent_refs(tx), transaction_utxos(tx))
+
+    snapshots = synthetic_mempool_snapshots([str(NETWORKS)], 2, 450000, 1.0)
+    # Snapshots only advance when the test says so.
+    replay = MempoolReplay(snapshots, 3600, on_block, state.tip_slot)
+    ogmios = start_fake_ogmios(replay, "127.0.0.1", 0, state)
+    client = connect_mempool(f"ws://127.0.0.1:{ogmios.socket.getsockname()[1]}")
+
+    events = []
+    monitor = MempoolMonitor(
+        client,
+        readers,
+        listener=lambda pending: events.append((pending.pair, pending.status)),
+        confirm_timeout=CONFIRM_TIMEOUT,
+    )
+    yield monitor, replay, events, sorted(c3_networks)
+
+    client.connection.close()
+    replay.stop()
+    ogmios.shutdown()
+    provider.shutdown()
+    provider.server_close()
+    context.close()
+
+
+def statuses(events, status):
+    return sorted(pair for pair, event_status in events if event_status == status)
+
+
+def test_pending_values_are_confirmed_or_dropped(mempool):
+    monitor, replay, events, pairs = mempool
+
+    monitor.process_snapshot(monitor.next_snapshot())
+    assert statuses(events, "pending") == pairs
+    assert len(monitor.pending) == len(pairs)
+
+    # The first transactions are included, except those of DROPPED_PAIR.
+    events.clear()
+    replay.advance()
+    monitor.process_snapshot(monitor.next_snapshot())
+    assert statuses(events, "pending") == pairs
+    assert statuses(events, "confirmed") == [
+        pair for pair in pairs if pair != DROPPED_PAIR
+    ]
+    assert statuses(events, "dropped") == []
+
+    # Past the timeout the first DROPPED_PAIR value is dropped.
+    events.clear()
+    time.sleep(CONFIRM_TIMEOUT + 0.1)
+    replay.advance()
+    monitor.process_snapshot(monitor.next_snapshot())
+    assert statuses(events, "confirmed") == [
+        pair for pair in pairs if pair != DROPPED_PAIR
+    ]
+    assert statuses(events, "dropped") == [DROPPED_PAIR]
+
+    events.clear()
+    monitor.check_confirmations(time.time() + CONFIRM_TIMEOUT + 1)
+    assert events == [(DROPPED_PAIR, "dropped")]
+    assert monitor.pending == {}
+
+
+def test_provider_errors_leave_values_pending(mempool, monkeypatch):
+    monitor, replay, events, pairs = mempool
+    monitor.process_snapshot(monitor.next_snapshot())
+    replay.advance()
+
+    def unavailable():
+        raise ConnectionError("provider unavailable")
+
+    for reader in monitor.readers.values():
+        monkeypatch.setattr(reader, "get_contract_utxos", unavailable)
+    events.clear()
+    monitor.process_snapshot(monitor.next_snapshot())
+    monitor.check_confirmations(time.time() + CONFIRM_TIMEOUT + 1)
+    assert statuses(events, "confirmed") == statuses(events, "dropped") == []
+    assert len(monitor.pending) == 2 * len(pairs)
+
+    # Once the provider answers again the values settle.
+    monkeypatch.undo()
+    monitor.check_confirmations()
+    assert statuses(events, "confirmed") == [
+        pair for pair in pairs if pair != DROPPED_PAIR
+    ]
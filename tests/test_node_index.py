@@ -0,0 +1,84 @@
+"""Node index runs that each cover one network."""
+
+import argparse
+from pathlib import Path
+
+import pytest
+import yaml
+
+from network_feed_demo.contexts import KupoChainContext
+from network_feed_demo.fake_server import (
+    FakeChainState,
+    add_fake_server_arguments,
+    build_fake_server,
+)
+from network_feed_demo.main import create_reader
+from network_feed_demo.node_index import NodeIndex, build_index
+from network_feed_demo.slots import SlotResolver
+
+ROOT = Path(__file__).resolve().parents[1]
+ENVIRONMENTS = ("preprod", "mainnet")
+
+
+def load_networks(environment):
+    with open(ROOT / f"{environment}-c3-networks.yaml", encoding="UTF-8") as networks:
+        return yaml.load(networks, Loader=yaml.FullLoader)
+
+
+@pytest.fixture
+def kupo_url():
+    args = add_fake_server_arguments(argparse.ArgumentParser()).parse_args(
+        ["--networks"]
+        + [
+            str(ROOT / f"{environment}-c3-networks.yaml")
+            for environment in ENVIRONMENTS
+        ]
+    )
+    state = FakeChainState.synthetic(args.networks, args)
+    server = build_fake_server(args, "127.0.0.1", 0, state)
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def index_environment(path, environment, kupo_url, slot_cache):
+    context = KupoChainContext(kupo_url)
+    c3_networks = load_networks(environment)
+    resolver = SlotResolver(context, cache_path=slot_cache)
+    readers = {
+        (environment, pair): (
+            entry.get("category", "charli3-network-feed"),
+            create_reader(pair, c3_networks, context, slot_resolver=resolver),
+        )
+        for pair, entry in c3_networks.items()
+    }
+    try:
+        build_index(NodeIndex.load(path), readers)
+    finally:
+        context.close()
+    return {f"{environment}/{pair}" for pair in c3_networks}
+
+
+def test_separate_runs_keep_every_network(kupo_url, tmp_path):
+    path = str(tmp_path / "node-index.json")
+    slot_cache = str(tmp_path / "tx-slots.json")
+
+    expected = set()
+    for environment in ENVIRONMENTS:
+        expected |= index_environment(path, environment, kupo_url, slot_cache)
+
+    index = NodeIndex.load(path)
+    assert set(index.sources) == expected
+    environments = {
+        feed["environment"] for feeds in index.nodes.values() for feed in feeds
+    }
+    assert environments == set(ENVIRONMENTS)
+
+    # Re-indexing one network still prunes its own removed pairs only.
+    index.sources["preprod/GONE-PAIR"] = dict(
+        index.sources["preprod/ADA-USD"], pair="GONE-PAIR"
+    )
+    index.save()
+    index_environment(path, "preprod", kupo_url, slot_cache)
+    assert set(NodeIndex.load(path).sources) == expected
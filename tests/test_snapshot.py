@@ -0,0 +1,141 @@
+"""Capture a fake provider's UTxO sets and replay them from the snapshot."""
+
+import argparse
+from pathlib import Path
+
+import pytest
+import yaml
+
+from network_feed_demo.contexts import KupoChainContext
+from network_feed_demo.fake_server import (
+    FakeChainState,
+    add_fake_server_arguments,
+    build_fake_server,
+)
+from network_feed_demo.main import create_reader
+from network_feed_demo.snapshot import SnapshotChainContext, write_snapshot
+from network_feed_demo.slots import SlotResolver
+
+NETWORKS = Path(__file__).resolve().parents[1] / "preprod-c3-networks.yaml"
+
+
+def utxo_summary(utxo):
+    """Comparable view of the UTxO fields the readers use."""
+    output = utxo.output
+    return (
+        str(utxo.input.transaction_id),
+        utxo.input.index,
+        str(output.address),
+        output.amount.coin,
+        output.amount.multi_asset.to_primitive() if output.amount.multi_asset else {},
+        output.datum.cbor if output.datum is not None else None,
+    )
+
+
+@pytest.fixture
+def fake_provider():
+    args = add_fake_server_arguments(argparse.ArgumentParser()).parse_args(
+        ["--networks", str(NETWORKS), "--feeds", "3", "--dust", "2"]
+    )
+    state = FakeChainState.synthetic(args.networks, args)
+    server = build_fake_server(args, "127.0.0.1", 0, state)
+    host, port = server.server_address[:2]
+    yield state, f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_capture_then_replay_returns_same_utxos(fake_provider, tmp_path):
+    state, kupo_url = fake_provider
+    pairs = {
+        f"pair-{position}": address
+        for position, address in enumerate(state.utxos_by_address)
+    }
+    path = tmp_path / "preprod.c3snap"
+
+    live = KupoChainContext(kupo_url)
+    try:
+        counts = write_snapshot(
+            path,
+            live,
+            pairs,
+            "preprod",
+            "kupo",
+            SlotResolver(live, cache_path=str(tmp_path / "capture-slots.json")),
+        )
+        expected = {address: live.utxos(address) for address in pairs.values()}
+    finally:
+        live.close()
+
+    replay = SnapshotChainContext(path)
+    try:
+        assert replay.environment == "preprod"
+        assert replay.pairs == pairs
+        for address, utxos in expected.items():
+            replayed = replay.utxos(address)
+            assert counts[address] == len(utxos) == len(state.utxos_by_address[address])
+            assert sorted(map(utxo_summary, replayed)) == sorted(
+                map(utxo_summary, utxos)
+            )
+            assert sorted(
+                utxo.output.datum.cbor
+                for utxo in replayed
+                if utxo.output.datum is not None
+            ) == sorted(
+                utxo.output.datum.cbor
+                for utxo in state.utxos_by_address[address]
+                if utxo.output.datum is not None
+            )
+    finally:
+        replay.close()
+
+
+def test_replay_orders_legacy_configurations_by_captured_slot(fake_provider, tmp_path):
+    state, kupo_url = fake_provider
+    with open(NETWORKS, encoding="UTF-8") as networks:
+        c3_networks = yaml.load(networks, Loader=yaml.FullLoader)
+    pair = "ADA-CHARLI3"
+    path = tmp_path / "preprod.c3snap"
+
+    live = KupoChainContext(kupo_url)
+    try:
+        write_snapshot(
+            path,
+            live,
+            {pair: c3_networks[pair]["address"]},
+            "preprod",
+            "kupo",
+            SlotResolver(live, cache_path=str(tmp_path / "capture-slots.json")),
+        )
+        live_reader = create_reader(
+            pair,
+            c3_networks,
+            live,
+            slot_resolver=SlotResolver(
+                live, cache_path=str(tmp_path / "live-slots.json")
+            ),
+        )
+        live_configurations = live_reader.get_all_network_configurations()
+        live_latest = live_reader.get_network_configuration()
+    finally:
+        live.close()
+
+    replay = SnapshotChainContext(path)
+    try:
+        for tx_id, _, _ in live_configurations:
+            assert replay.transaction_slot(tx_id) == state.slots[str(tx_id)]
+        # A fresh slot cache: every slot must come from the snapshot itself.
+        replay_reader = create_reader(
+            pair,
+            c3_networks,
+            replay,
+            slot_resolver=SlotResolver(
+                replay, cache_path=str(tmp_path / "replay-slots.json")
+            ),
+        )
+        assert [
+            tx_id for tx_id, _, _ in replay_reader.get_all_network_configurations()
+        ] == [tx_id for tx_id, _, _ in live_configurations]
+        assert replay_reader.get_network_configuration() == live_latest
+    finally:
+        replay.close()